@@ -1,9 +1,90 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin import helpers
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ORDER_VAR, PAGE_VAR, ChangeList
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.db import transaction
+from django.db.models import Q
+from django.forms import BaseModelFormSet
 from django.template.defaultfilters import truncatewords
+from django.template.response import TemplateResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
-from .models import Location, Category, Post
+from core.paginator import EstimatedCountPaginator
+from .counters import rebuild_author_stats, recount_categories
+from .feeds import invalidate_feeds
+from .models import Location, Category, Comment, Post
 
 SHORT_STANDARD = 50
+# Ids per DELETE statement; keeps IN lists under SQLite's variable limit.
+DELETE_CHUNK_SIZE = 500
+# Choices a related list filter shows in the changelist sidebar.
+LIST_FILTER_LIMIT = 20
+# "Older posts" keyset parameter: pub_date and id of the last row seen.
+OLDER_VAR = 'older'
+
+
+class MoveToCategoryForm(forms.Form):
+    category = forms.ModelChoiceField(
+        queryset=Category.objects.order_by('title'),
+        label='Новая категория',
+    )
+
+
+def touched_categories(queryset, *extra_ids):
+    ids = set(
+        queryset.order_by().values_list('category_id', flat=True).distinct()
+    )
+    return (ids | set(extra_ids)) - {None}
+
+
+def touched_authors(queryset, with_commenters=False):
+    ids = set(
+        queryset.order_by().values_list('author_id', flat=True).distinct()
+    )
+    if with_commenters:
+        ids |= set(
+            Comment.objects.filter(post__in=queryset.values('id'))
+            .order_by().values_list('author_id', flat=True).distinct()
+        )
+    return ids
+
+
+def delete_posts_with_comments(queryset, chunk_size=None):
+    """Delete posts and their comments with plain DELETE statements.
+
+    QuerySet.delete() collects every row to send signals, which does not
+    scale to large selections; here only ids are read, chunk by chunk.
+
+    _raw_delete() skips cascades and signals. That is safe while comments
+    are the only rows pointing at posts and nothing points at comments
+    (tests/test_admin.py pins it); the signal work, counters, author stats
+    and feeds, is redone below for everything touched.
+    """
+    chunk_size = chunk_size or DELETE_CHUNK_SIZE
+    ids = queryset.order_by('id').values_list('id', flat=True)
+    categories = touched_categories(queryset)
+    authors = touched_authors(queryset, with_commenters=True)
+    deleted = 0
+    with transaction.atomic():
+        last_id = 0
+        while True:
+            chunk = list(ids.filter(id__gt=last_id)[:chunk_size])
+            if not chunk:
+                break
+            last_id = chunk[-1]
+            Comment.objects.filter(post_id__in=chunk)._raw_delete(
+                queryset.db
+            )
+            deleted += Post.objects.filter(id__in=chunk)._raw_delete(
+                queryset.db
+            )
+        recount_categories(Category.objects.filter(id__in=categories))
+        rebuild_author_stats(authors)
+    invalidate_feeds(categories, authors)
+    return deleted
 
 
 @admin.register(Location)
@@ -19,6 +100,9 @@ class LocationAdmin(admin.ModelAdmin):
     list_filter = (
         'is_published',
     )
+    search_fields = (
+        'name',
+    )
 
 
 @admin.register(Category)
@@ -26,6 +110,8 @@ class CategoryAdmin(admin.ModelAdmin):
     list_display = (
         'title',
         'description',
+        'post_count',
+        'last_post_at',
         'created_at',
         'is_published',
     )
@@ -35,6 +121,130 @@ class CategoryAdmin(admin.ModelAdmin):
     list_filter = (
         'is_published',
     )
+    search_fields = (
+        'title',
+    )
+    actions = (
+        'recount',
+    )
+
+    @admin.action(description='Пересчитать публикации')
+    def recount(self, request, queryset):
+        recount_categories(queryset)
+        self.message_user(request, 'Счётчики пересчитаны.', messages.SUCCESS)
+
+
+class RowAutocompleteSelect(AutocompleteSelect):
+    """Autocomplete that takes its selected option from a loaded object.
+
+    The stock widget queries the selected option on every render, i.e. once
+    per changelist row; the rows already carry it through select_related.
+    """
+
+    selected_object = None
+
+    def optgroups(self, name, value, attr=None):
+        selected = self.selected_object
+        if selected is None or [str(v) for v in value] != [str(selected.pk)]:
+            return super().optgroups(name, value, attr)
+        options = []
+        if not self.is_required:
+            options.append(self.create_option(name, '', '', False, 0))
+        label = self.choices.field.label_from_instance(selected)
+        options.append(
+            self.create_option(name, selected.pk, label, True, len(options))
+        )
+        return [(None, options, 0)]
+
+
+class PostChangeListFormSet(BaseModelFormSet):
+    def _construct_form(self, i, **kwargs):
+        form = super()._construct_form(i, **kwargs)
+        for field in form.fields.values():
+            widget = getattr(field.widget, 'widget', field.widget)
+            if isinstance(widget, RowAutocompleteSelect):
+                widget.selected_object = getattr(
+                    form.instance, widget.field.name
+                )
+        return form
+
+
+class LimitedRelatedFilter(admin.RelatedFieldListFilter):
+    """Related filter listing at most LIST_FILTER_LIMIT choices.
+
+    The stock filter loads the whole related table into the sidebar on
+    every changelist request; here the first choices by ordering are
+    shown, plus the selected one.
+    """
+
+    ordering = ('pk',)
+
+    def field_choices(self, field, request, model_admin):
+        queryset = field.related_model._default_manager.order_by(
+            *self.ordering
+        )
+        choices = [
+            (obj.pk, str(obj)) for obj in queryset[:LIST_FILTER_LIMIT]
+        ]
+        if (self.lookup_val
+                and self.lookup_val not in {str(pk) for pk, _ in choices}):
+            choices += [
+                (obj.pk, str(obj))
+                for obj in queryset.filter(pk=self.lookup_val)
+            ]
+        return choices
+
+
+class LocationFilter(LimitedRelatedFilter):
+    ordering = ('name',)
+
+
+class CategoryFilter(LimitedRelatedFilter):
+    ordering = ('-post_count', 'title')
+
+
+class PostChangeList(ChangeList):
+    """Changelist with an "older posts" link for deep navigation.
+
+    Far pages of an OFFSET pagination scan every skipped row; the link
+    filters on (pub_date, id) of the last row instead, which follows the
+    (-pub_date, -id) ordering and uses the index.
+    """
+
+    def get_filters_params(self, params=None):
+        params = super().get_filters_params(params)
+        params.pop(OLDER_VAR, None)
+        return params
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request).defer('text')
+        older = self.params.get(OLDER_VAR)
+        if older is None:
+            return queryset
+        pub_date, _, pk = older.rpartition(',')
+        try:
+            pub_date = parse_datetime(pub_date)
+            pk = int(pk)
+        except ValueError:
+            pub_date = None
+        if pub_date is None:
+            raise IncorrectLookupParameters
+        return queryset.filter(
+            Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, id__lt=pk)
+        )
+
+    def get_results(self, request):
+        super().get_results(request)
+        self.older_query_string = None
+        results = self.result_list
+        # Only the default ordering matches the keyset filter.
+        if ORDER_VAR in self.params or len(results) < self.list_per_page:
+            return
+        last = results[len(results) - 1]
+        self.older_query_string = self.get_query_string(
+            {OLDER_VAR: f'{last.pub_date.isoformat()},{last.pk}'},
+            remove=[PAGE_VAR],
+        )
 
 
 @admin.register(Post)
@@ -56,13 +266,118 @@ class PostAdmin(admin.ModelAdmin):
         'is_published',
     )
     list_filter = (
-        'location',
-        'category',
+        ('location', LocationFilter),
+        ('category', CategoryFilter),
         'is_published',
     )
     ordering = (
         '-pub_date',
+        '-id',
+    )
+    list_select_related = (
+        'author',
+        'location',
+        'category',
+    )
+    autocomplete_fields = (
+        'author',
+        'location',
+        'category',
+    )
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    actions = (
+        'publish_posts',
+        'unpublish_posts',
+        'move_to_category',
+        'delete_with_comments',
+    )
+
+    def get_changelist(self, request, **kwargs):
+        return PostChangeList
+
+    def get_changelist_formset(self, request, **kwargs):
+        kwargs.setdefault('formset', PostChangeListFormSet)
+        return super().get_changelist_formset(request, **kwargs)
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        if db_field.name in self.get_autocomplete_fields(request):
+            kwargs.setdefault('widget', RowAutocompleteSelect(
+                db_field, self.admin_site, using=kwargs.get('using')
+            ))
+        return super().formfield_for_foreignkey(db_field, request, **kwargs)
+
+    def update_posts(self, request, queryset, message, **values):
+        category = values.get('category')
+        categories = touched_categories(
+            queryset, *([category.id] if category else [])
+        )
+        authors = touched_authors(queryset)
+        with transaction.atomic():
+            updated = queryset.update(updated_at=timezone.now(), **values)
+            recount_categories(Category.objects.filter(id__in=categories))
+            rebuild_author_stats(authors)
+        invalidate_feeds(categories, authors)
+        self.message_user(request, message % updated, messages.SUCCESS)
+
+    @admin.action(
+        description='Опубликовать выбранные публикации',
+        permissions=('change',),
+    )
+    def publish_posts(self, request, queryset):
+        self.update_posts(
+            request, queryset, 'Опубликовано публикаций: %d.',
+            is_published=True
+        )
+
+    @admin.action(
+        description='Снять с публикации выбранные публикации',
+        permissions=('change',),
+    )
+    def unpublish_posts(self, request, queryset):
+        self.update_posts(
+            request, queryset, 'Снято с публикации: %d.',
+            is_published=False
+        )
+
+    @admin.action(
+        description='Перенести в другую категорию',
+        permissions=('change',),
+    )
+    def move_to_category(self, request, queryset):
+        form = MoveToCategoryForm(
+            request.POST if 'apply' in request.POST else None
+        )
+        if form.is_valid():
+            self.update_posts(
+                request, queryset, 'Перенесено публикаций: %d.',
+                category=form.cleaned_data['category']
+            )
+            return None
+        return TemplateResponse(
+            request, 'admin/blog/post/move_to_category.html', {
+                **self.admin_site.each_context(request),
+                'title': 'Перенос публикаций в категорию',
+                'opts': self.model._meta,
+                'form': form,
+                'count': queryset.count(),
+                'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+                'selected': request.POST.getlist(
+                    helpers.ACTION_CHECKBOX_NAME
+                ),
+                'select_across': request.POST.get('select_across', '0'),
+            }
+        )
+
+    @admin.action(
+        description='Удалить выбранные публикации вместе с комментариями',
+        permissions=('delete',),
     )
+    def delete_with_comments(self, request, queryset):
+        deleted = delete_posts_with_comments(queryset)
+        self.message_user(
+            request, f'Удалено публикаций: {deleted}.', messages.SUCCESS
+        )
 
     @admin.display(description='Заголовок')
     def short_title(self, obj):
@@ -70,7 +385,7 @@ class PostAdmin(admin.ModelAdmin):
 
     @admin.display(description='Текст')
     def short_text(self, obj):
-        return truncatewords(obj.text, 10)
+        return obj.excerpt
 
     @admin.display(description='Местоположение')
     def short_location(self, obj):
@@ -0,0 +1,508 @@
+import base64
+import json
+from io import BytesIO
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Q
+from django.forms.models import model_to_dict
+from django.http import Http404, HttpResponse, JsonResponse, QueryDict
+from django.http.multipartparser import MultiPartParserError
+from django.middleware.csrf import CsrfViewMiddleware, get_token
+from django.urls import reverse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt, ensure_csrf_cookie
+
+from .forms import CommentForm, PostForm
+from .models import Category, Comment, Location, Post, User
+from .views import DispatchCommentMixin, DispatchPostMixin
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+MAX_PAGE_SIZE = 100
+MAX_BATCH_SIZE = 100
+LOOKUP_LIMIT = 20
+
+# API field name -> ORM lookup. Rows are fetched with values_list() over
+# the requested lookups only, so the response never builds model instances.
+POST_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'image': 'image',
+    'author': 'author__username',
+    'category': 'category__slug',
+    'location': 'location__name',
+    'is_published': 'is_published',
+    'created_at': 'created_at',
+    'comment_count': 'comment_count',
+}
+COMMENT_FIELDS = {
+    'id': 'id',
+    'post': 'post_id',
+    'author': 'author__username',
+    'text': 'text',
+    'created_at': 'created_at',
+}
+CATEGORY_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'slug': 'slug',
+    'description': 'description',
+}
+LOCATION_FIELDS = {
+    'id': 'id',
+    'name': 'name',
+}
+PROFILE_FIELDS = {
+    'id': 'id',
+    'username': 'username',
+    'first_name': 'first_name',
+    'last_name': 'last_name',
+    'date_joined': 'date_joined',
+}
+
+
+class ApiError(Exception):
+    def __init__(self, status, message, **extra):
+        super().__init__(message)
+        self.status = status
+        self.payload = {'error': message, **extra}
+
+
+def json_response(data, status=200):
+    return JsonResponse(
+        data, status=status, encoder=DjangoJSONEncoder, safe=False,
+        json_dumps_params={'ensure_ascii': False},
+    )
+
+
+def serialize(queryset, fields, names, extra=()):
+    """Turn a queryset into plain dicts with a single values_list() query.
+
+    Lookups listed in extra are fetched after the requested ones; zip()
+    stops at the last requested name, so they never reach the output.
+    """
+    lookups = [fields[name] for name in names] + list(extra)
+    rows = list(queryset.values_list(*lookups))
+    results = [dict(zip(names, row)) for row in rows]
+    if 'image' in names:
+        for item in results:
+            item['image'] = (
+                default_storage.url(item['image']) if item['image'] else None
+            )
+    return results, rows
+
+
+def encode_cursor(*values):
+    raw = '|'.join(str(value) for value in values)
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor, position_field):
+    """Position and id of the last row seen, parsed by the model field."""
+    try:
+        position, pk = base64.urlsafe_b64decode(
+            cursor.encode()
+        ).decode().rsplit('|', 1)
+        return position_field.to_python(position), int(pk)
+    except (ValueError, ValidationError):
+        raise ApiError(400, 'Invalid cursor.')
+
+
+class CsrfCheck(CsrfViewMiddleware):
+    """The stock CSRF check, returning the failure reason, not a page."""
+
+    def _reject(self, request, reason):
+        return reason
+
+
+def check_csrf(request):
+    reason = CsrfCheck(lambda request: None).process_view(
+        request, None, (), {}
+    )
+    if reason:
+        raise ApiError(403, 'CSRF check failed.', reason=reason)
+
+
+class ApiMixin:
+    """JSON views: errors as JSON, 401 for anonymous writes.
+
+    Writes need the X-CSRFToken header from the csrf/ endpoint; the check
+    runs here instead of in the middleware so failures answer in JSON.
+    Ownership checks come from DispatchBaseMixin; a non-owner gets 403
+    instead of the redirect the HTML views use.
+    """
+
+    fields: dict = {}
+    default_fields: tuple = ()
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            if request.method not in SAFE_METHODS:
+                if not request.user.is_authenticated:
+                    raise ApiError(401, 'Authentication required.')
+                check_csrf(request)
+            return super().dispatch(request, *args, **kwargs)
+        except Http404:
+            return json_response({'error': 'Not found.'}, status=404)
+        except ApiError as error:
+            return json_response(error.payload, status=error.status)
+
+    def get_field_names(self):
+        requested = self.request.GET.get('fields')
+        if not requested:
+            return list(self.default_fields or self.fields)
+        names = [name for name in map(str.strip, requested.split(',')) if name]
+        if not names:
+            return list(self.default_fields or self.fields)
+        unknown = sorted(set(names) - set(self.fields))
+        if unknown:
+            raise ApiError(400, 'Unknown fields.', fields=unknown)
+        return names
+
+    def get_page_size(self):
+        try:
+            limit = int(self.request.GET.get('limit', settings.ITEM_PER_PAGE))
+        except ValueError:
+            raise ApiError(400, 'Invalid limit.')
+        return max(1, min(limit, MAX_PAGE_SIZE))
+
+    def get_data(self):
+        """Request body as a dict; uploaded files are left in self.files."""
+        request = self.request
+        if (request.method != 'POST'
+                and request.content_type == 'multipart/form-data'):
+            # Django parses form bodies of POST requests only.
+            try:
+                data, self.files = request.parse_file_upload(
+                    request.META, BytesIO(request.body)
+                )
+            except MultiPartParserError:
+                raise ApiError(400, 'Invalid form data.')
+            return data.dict()
+        self.files = request.FILES
+        if request.content_type == 'application/json':
+            try:
+                data = json.loads(request.body or b'{}')
+            except ValueError:
+                raise ApiError(400, 'Invalid JSON.')
+            if not isinstance(data, dict):
+                raise ApiError(400, 'Expected a JSON object.')
+            return data
+        if request.method == 'POST':
+            return request.POST.dict()
+        return QueryDict(request.body, encoding=request.encoding).dict()
+
+    def handle_not_owner(self, query_set):
+        raise ApiError(403, 'Only the author can change this object.')
+
+    def requires_owner(self, request):
+        return request.method not in SAFE_METHODS
+
+    def form_errors(self, form):
+        return json_response({'errors': form.errors}, status=400)
+
+
+class CursorListMixin:
+    """Keyset pagination over (position_field, id).
+
+    The cursor encodes the last row seen, so deep pages cost the same as
+    the first one.
+    """
+
+    position_field: str
+    descending = True
+
+    def paginate(self, queryset, names):
+        cursor = self.request.GET.get('cursor')
+        if self.descending:
+            order = (f'-{self.position_field}', '-id')
+            after = 'lt'
+        else:
+            order = (self.position_field, 'id')
+            after = 'gt'
+        if cursor:
+            position, pk = decode_cursor(
+                cursor, queryset.model._meta.get_field(self.position_field)
+            )
+            queryset = queryset.filter(
+                Q(**{f'{self.position_field}__{after}': position})
+                | Q(**{self.position_field: position, f'id__{after}': pk})
+            )
+        page_size = self.get_page_size()
+        results, rows = serialize(
+            queryset.order_by(*order)[:page_size + 1],
+            self.fields, names, extra=(self.position_field, 'id'),
+        )
+        next_url = None
+        if len(rows) > page_size:
+            results = results[:page_size]
+            query = self.request.GET.copy()
+            query['cursor'] = encode_cursor(*rows[page_size - 1][-2:])
+            next_url = self.request.build_absolute_uri(
+                f'{self.request.path}?{query.urlencode()}'
+            )
+        return {'results': results, 'next': next_url}
+
+
+class PostQueryMixin:
+    fields = POST_FIELDS
+    default_fields = (
+        'id', 'title', 'text', 'pub_date', 'image', 'author', 'category',
+        'location', 'comment_count',
+    )
+
+    def annotate(self, queryset, names):
+        if 'comment_count' in names:
+            queryset = queryset.annotate(comment_count=Count('comments'))
+        return queryset
+
+    def get_post_data(self, queryset):
+        names = self.get_field_names()
+        results, _ = serialize(
+            self.annotate(queryset, names), self.fields, names
+        )
+        if not results:
+            raise Http404
+        return results[0]
+
+
+class PostListApiView(PostQueryMixin, CursorListMixin, ApiMixin, View):
+    position_field = 'pub_date'
+
+    def get(self, request):
+        names = self.get_field_names()
+        queryset = Post.objects.visible()
+        if 'category' in request.GET:
+            queryset = queryset.filter(category__slug=request.GET['category'])
+        if 'author' in request.GET:
+            queryset = queryset.filter(author__username=request.GET['author'])
+        return json_response(
+            self.paginate(self.annotate(queryset, names), names)
+        )
+
+    def post(self, request):
+        form = PostForm(self.get_data(), self.files)
+        if not form.is_valid():
+            return self.form_errors(form)
+        form.instance.author = request.user
+        post = form.save()
+        return json_response(
+            self.get_post_data(Post.objects.filter(id=post.id)), status=201
+        )
+
+
+class PostBatchApiView(PostQueryMixin, ApiMixin, View):
+    """Visible posts for a list of ids in two queries.
+
+    One id__in query for the posts and one grouped query for their comment
+    counts, instead of a COUNT join over every requested row.
+    """
+
+    def get_ids(self):
+        try:
+            ids = [
+                int(value) for value in
+                self.request.GET.get('ids', '').split(',') if value
+            ]
+        except ValueError:
+            raise ApiError(400, 'Invalid ids.')
+        if not ids:
+            raise ApiError(400, 'No ids given.')
+        if len(ids) > MAX_BATCH_SIZE:
+            raise ApiError(
+                400, 'Too many ids.', max_batch_size=MAX_BATCH_SIZE
+            )
+        return list(dict.fromkeys(ids))
+
+    def get(self, request):
+        ids = self.get_ids()
+        names = self.get_field_names()
+        post_names = [name for name in names if name != 'comment_count']
+        results, rows = serialize(
+            Post.objects.visible().filter(id__in=ids),
+            self.fields, post_names, extra=('id',),
+        )
+        posts = {row[-1]: item for row, item in zip(rows, results)}
+        if 'comment_count' in names:
+            counts = dict(
+                Comment.objects.filter(post_id__in=posts)
+                .values_list('post_id')
+                .annotate(total=Count('id'))
+                .order_by()
+            )
+            for post_id, item in posts.items():
+                item['comment_count'] = counts.get(post_id, 0)
+        return json_response({
+            'results': [posts[pk] for pk in ids if pk in posts],
+            'missing': [pk for pk in ids if pk not in posts],
+        })
+
+
+class PostDetailApiView(
+        PostQueryMixin, ApiMixin, DispatchPostMixin, View):
+    def get(self, request, post_id):
+        return json_response(self.get_post_data(
+            Post.objects.visible_to(request.user).filter(id=post_id)
+        ))
+
+    def patch(self, request, post_id):
+        post = self.get_object()
+        data = model_to_dict(post, fields=PostForm().fields)
+        data.pop('image', None)
+        data.update(self.get_data())
+        form = PostForm(data, self.files, instance=post)
+        if not form.is_valid():
+            return self.form_errors(form)
+        form.save()
+        return json_response(
+            self.get_post_data(Post.objects.filter(id=post_id))
+        )
+
+    put = patch
+
+    def delete(self, request, post_id):
+        Post.objects.filter(id=post_id).delete()
+        return HttpResponse(status=204)
+
+
+class CommentListApiView(CursorListMixin, ApiMixin, View):
+    fields = COMMENT_FIELDS
+    position_field = 'created_at'
+    descending = False
+
+    def check_post(self, post_id):
+        if not Post.objects.is_visible(post_id):
+            raise Http404
+
+    def get(self, request, post_id):
+        self.check_post(post_id)
+        return json_response(self.paginate(
+            Comment.objects.filter(post_id=post_id), self.get_field_names()
+        ))
+
+    def post(self, request, post_id):
+        self.check_post(post_id)
+        form = CommentForm(self.get_data())
+        if not form.is_valid():
+            return self.form_errors(form)
+        form.instance.author = request.user
+        form.instance.post_id = post_id
+        comment = form.save()
+        results, _ = serialize(
+            Comment.objects.filter(id=comment.id),
+            self.fields, self.get_field_names(),
+        )
+        return json_response(results[0], status=201)
+
+
+class CommentDetailApiView(ApiMixin, DispatchCommentMixin, View):
+    fields = COMMENT_FIELDS
+
+    def get_comment_data(self, queryset):
+        results, _ = serialize(
+            queryset, self.fields, self.get_field_names()
+        )
+        if not results:
+            raise Http404
+        return results[0]
+
+    def get(self, request, comment_id):
+        return json_response(self.get_comment_data(
+            Comment.objects.filter(
+                id=comment_id, post__in=Post.objects.visible()
+            )
+        ))
+
+    def patch(self, request, comment_id):
+        comment = self.get_object()
+        form = CommentForm(
+            {'text': comment.text, **self.get_data()}, instance=comment
+        )
+        if not form.is_valid():
+            return self.form_errors(form)
+        form.save()
+        return json_response(
+            self.get_comment_data(Comment.objects.filter(id=comment_id))
+        )
+
+    put = patch
+
+    def delete(self, request, comment_id):
+        Comment.objects.filter(id=comment_id).delete()
+        return HttpResponse(status=204)
+
+
+class CategoryListApiView(ApiMixin, View):
+    fields = CATEGORY_FIELDS
+
+    def get(self, request):
+        results, _ = serialize(
+            Category.objects.filter(is_published=True).order_by('title'),
+            self.fields, self.get_field_names(),
+        )
+        return json_response({'results': results})
+
+
+class LocationListApiView(ApiMixin, View):
+    fields = LOCATION_FIELDS
+
+    def get(self, request):
+        results, _ = serialize(
+            Location.objects.filter(is_published=True).order_by('name'),
+            self.fields, self.get_field_names(),
+        )
+        return json_response({'results': results})
+
+
+class LookupApiView(ApiMixin, View):
+    """Prefix search for form widgets, answered from the name index."""
+
+    model = None
+    label_field = None
+
+    def get(self, request):
+        queryset = self.model.objects.filter(is_published=True)
+        prefix = request.GET.get('q', '').strip()
+        if prefix:
+            queryset = queryset.filter(
+                **{f'{self.label_field}__startswith': prefix}
+            )
+        rows = queryset.order_by(self.label_field).values_list(
+            'id', self.label_field
+        )[:LOOKUP_LIMIT]
+        return json_response({
+            'results': [{'id': pk, 'text': label} for pk, label in rows]
+        })
+
+
+@method_decorator(ensure_csrf_cookie, name='get')
+class CsrfTokenApiView(ApiMixin, View):
+    def get(self, request):
+        return json_response({'csrftoken': get_token(request)})
+
+
+class ProfileApiView(ApiMixin, View):
+    fields = PROFILE_FIELDS
+
+    def get(self, request, username):
+        results, _ = serialize(
+            User.objects.filter(username=username),
+            self.fields, self.get_field_names(),
+        )
+        if not results:
+            raise Http404
+        profile = results[0]
+        profile['posts'] = request.build_absolute_uri(
+            reverse('api:posts') + '?' + urlencode({'author': username})
+        )
+        return json_response(profile)
@@ -0,0 +1,44 @@
+from django.urls import path
+
+from . import api
+from .models import Category, Location
+
+app_name = 'api'
+
+urlpatterns = [
+    path('csrf/', api.CsrfTokenApiView.as_view(), name='csrf'),
+    path('posts/', api.PostListApiView.as_view(), name='posts'),
+    path('posts/batch/', api.PostBatchApiView.as_view(), name='post_batch'),
+    path(
+        'posts/<int:post_id>/',
+        api.PostDetailApiView.as_view(),
+        name='post_detail'
+    ),
+    path(
+        'posts/<int:post_id>/comments/',
+        api.CommentListApiView.as_view(),
+        name='comments'
+    ),
+    path(
+        'comments/<int:comment_id>/',
+        api.CommentDetailApiView.as_view(),
+        name='comment_detail'
+    ),
+    path('categories/', api.CategoryListApiView.as_view(), name='categories'),
+    path('locations/', api.LocationListApiView.as_view(), name='locations'),
+    path(
+        'lookup/categories/',
+        api.LookupApiView.as_view(model=Category, label_field='title'),
+        name='category_lookup'
+    ),
+    path(
+        'lookup/locations/',
+        api.LookupApiView.as_view(model=Location, label_field='name'),
+        name='location_lookup'
+    ),
+    path(
+        'profiles/<str:username>/',
+        api.ProfileApiView.as_view(),
+        name='profile'
+    ),
+]
@@ -0,0 +1,169 @@
+"""Post counters per category and per author, kept up to date from changes.
+
+A post counts while it is published and its pub_date has passed. Single
+saves and deletes adjust the counters by one; bulk operations and the
+scheduler's post_published event call recount_categories() and
+rebuild_author_stats() for the rows they touched.
+"""
+from django.apps import apps as global_apps
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+
+from .models import AuthorStats, Category, Post
+
+REBUILD_BATCH_SIZE = 1000
+
+
+def is_counted(is_published, pub_date):
+    return bool(is_published) and pub_date is not None and (
+        pub_date <= timezone.now()
+    )
+
+
+def add_post(category_id, pub_date):
+    Category.objects.filter(id=category_id).update(
+        post_count=F('post_count') + 1,
+        last_post_at=Greatest(Coalesce('last_post_at', pub_date), pub_date),
+    )
+
+
+def remove_post(category_id, pub_date):
+    Category.objects.filter(id=category_id).update(
+        post_count=Greatest(F('post_count') - 1, 0)
+    )
+    # Only losing the latest post moves last_post_at back.
+    if Category.objects.filter(id=category_id, last_post_at=pub_date).exists():
+        recount_categories(Category.objects.filter(id=category_id))
+
+
+def counted_key(row):
+    """(category_id, author_id, pub_date) of a counted post row, else None.
+
+    Rows are (category_id, author_id, is_published, pub_date) tuples.
+    """
+    if row is None:
+        return None
+    category_id, author_id, is_published, pub_date = row
+    if not is_counted(is_published, pub_date):
+        return None
+    return category_id, author_id, pub_date
+
+
+def move_post(old, new):
+    """Apply the change of a post from the old row to the new one."""
+    old, new = counted_key(old), counted_key(new)
+    if old == new:
+        return
+    same_author = old and new and old[1] == new[1]
+    if old:
+        if old[0]:
+            remove_post(old[0], old[2])
+        if not same_author:
+            bump_author(old[1], posts=-1)
+    if new:
+        if new[0]:
+            add_post(new[0], new[2])
+        if not same_author:
+            bump_author(new[1], posts=1)
+
+
+def recount_categories(queryset=None, post_model=Post):
+    """Recompute counters with one UPDATE over the given categories.
+
+    Data migrations pass historical models for both arguments; their
+    managers are reached through _default_manager.
+    """
+    posts = post_model._default_manager.filter(
+        category=OuterRef('pk'),
+        is_published=True,
+        pub_date__lte=timezone.now(),
+    ).order_by().values('category')
+    queryset = Category.objects.all() if queryset is None else queryset
+    return queryset.update(
+        post_count=Coalesce(
+            Subquery(
+                posts.annotate(total=Count('id')).values('total'),
+                output_field=IntegerField()
+            ),
+            0
+        ),
+        last_post_at=Subquery(
+            posts.annotate(latest=Max('pub_date')).values('latest')
+        ),
+    )
+
+
+def bump_author(user_id, posts=0, comments=0, active_at=None):
+    values = {}
+    if posts:
+        values['post_count'] = Greatest(F('post_count') + posts, 0)
+    if comments:
+        values['comment_count'] = Greatest(F('comment_count') + comments, 0)
+    if active_at:
+        values['last_activity'] = Greatest(
+            Coalesce('last_activity', active_at), active_at
+        )
+    if values and not AuthorStats.objects.filter(user_id=user_id).update(
+            **values):
+        # No row yet: build it from scratch, which includes this change.
+        rebuild_author_stats([user_id])
+
+
+def grouped(queryset, *aggregates):
+    rows = queryset.order_by().values('author').annotate(
+        *aggregates
+    ).values_list('author', *(aggregate.default_alias
+                              for aggregate in aggregates))
+    return {row[0]: row[1:] for row in rows}
+
+
+def rebuild_author_stats(user_ids=None, batch_size=REBUILD_BATCH_SIZE,
+                         apps=global_apps):
+    """Recompute AuthorStats from posts and comments, batch by batch.
+
+    Data migrations pass their historical app registry as apps.
+    """
+    stats_model = apps.get_model('blog', 'AuthorStats')
+    posts_model = apps.get_model('blog', 'Post')
+    comments_model = apps.get_model('blog', 'Comment')
+    users = apps.get_model(settings.AUTH_USER_MODEL).objects.order_by(
+        'id'
+    ).values_list('id', flat=True)
+    if user_ids is not None:
+        users = users.filter(id__in=user_ids)
+    rebuilt = 0
+    last_id = 0
+    while True:
+        ids = list(users.filter(id__gt=last_id)[:batch_size])
+        if not ids:
+            return rebuilt
+        last_id = ids[-1]
+        posts = posts_model._default_manager.filter(author_id__in=ids)
+        published = grouped(
+            posts.filter(is_published=True, pub_date__lte=timezone.now()),
+            Count('id'),
+        )
+        written = grouped(posts, Max('created_at'))
+        comments = grouped(
+            comments_model._default_manager.filter(author_id__in=ids),
+            Count('id'), Max('created_at'),
+        )
+        stats = []
+        for user_id in ids:
+            comment_count, last_comment = comments.get(user_id, (0, None))
+            last_post, = written.get(user_id, (None,))
+            stats.append(stats_model(
+                user_id=user_id,
+                post_count=published.get(user_id, (0,))[0],
+                comment_count=comment_count,
+                last_activity=max(
+                    filter(None, (last_post, last_comment)), default=None
+                ),
+            ))
+        with transaction.atomic():
+            stats_model.objects.filter(user_id__in=ids).delete()
+            stats_model.objects.bulk_create(stats)
+        rebuilt += len(ids)
@@ -0,0 +1,203 @@
+import json
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.template.loader import render_to_string
+from django.utils.module_loading import import_string
+
+from .models import Comment, Post
+
+BUFFER_SIZE = 100
+# Posts with buffered comments; the least recently commented go first.
+MAX_BUFFERED_POSTS = 1000
+# Seconds a post's buffer outlives its last comment.
+BUFFER_TTL = 5 * 60
+
+
+def comment_payload(comment):
+    return {
+        'id': comment.id,
+        'post': comment.post_id,
+        'author': comment.author.username,
+        'text': comment.text,
+        'created_at': comment.created_at,
+        # Same markup as the server-rendered list.
+        'html': render_to_string(
+            'includes/comment.html', {'comment': comment}
+        ),
+    }
+
+
+class InProcessBroker:
+    """Pub/sub between the threads of one process.
+
+    Keeps the last BUFFER_SIZE comments of recently commented posts in
+    memory; waiting readers are woken by publish() instead of polling the
+    database. Buffers older than BUFFER_TTL and beyond MAX_BUFFERED_POSTS
+    are dropped; readers that fall behind catch up from the database.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        # post_id -> (last publish time, payloads), oldest publish first.
+        self._events = {}
+
+    def publish(self, post_id, payload):
+        with self._condition:
+            _, events = self._events.pop(
+                post_id, (None, deque(maxlen=BUFFER_SIZE))
+            )
+            events.append(payload)
+            self._events[post_id] = (time.monotonic(), events)
+            self._evict()
+            self._condition.notify_all()
+
+    def _evict(self):
+        expired = time.monotonic() - BUFFER_TTL
+        for post_id, (published_at, _) in list(self._events.items()):
+            if (len(self._events) <= MAX_BUFFERED_POSTS
+                    and published_at > expired):
+                return
+            del self._events[post_id]
+
+    def _pending(self, post_id, after_id):
+        _, events = self._events.get(post_id, (None, ()))
+        return [payload for payload in events if payload['id'] > after_id]
+
+    def wait(self, post_id, after_id, timeout):
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._pending(post_id, after_id), timeout
+            )
+            return self._pending(post_id, after_id)
+
+
+class DatabaseBroker:
+    """Stand-in for a shared broker when several processes serve streams.
+
+    Comments written by any process land in the same table, so readers poll
+    it for rows newer than the last one they sent.
+    """
+
+    def publish(self, post_id, payload):
+        pass
+
+    def wait(self, post_id, after_id, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            comments = list(
+                Comment.objects.filter(post_id=post_id, id__gt=after_id)
+                .select_related('author').order_by('id')
+            )
+            remaining = deadline - time.monotonic()
+            if comments or remaining <= 0:
+                return [comment_payload(comment) for comment in comments]
+            time.sleep(min(settings.COMMENT_STREAM_POLL_INTERVAL, remaining))
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    return import_string(settings.COMMENT_BROKER)()
+
+
+def publish_comment(comment):
+    get_broker().publish(comment.post_id, comment_payload(comment))
+
+
+def format_event(payload):
+    data = json.dumps(payload, cls=DjangoJSONEncoder, ensure_ascii=False)
+    return f'id: {payload["id"]}\nevent: comment\ndata: {data}\n\n'
+
+
+def get_last_event_id(request, post_id):
+    last_id = request.headers.get('Last-Event-ID') or request.GET.get('after')
+    if last_id is not None:
+        try:
+            return int(last_id)
+        except ValueError:
+            pass
+    latest = (
+        Comment.objects.filter(post_id=post_id)
+        .order_by('-id').values_list('id', flat=True).first()
+    )
+    return latest or 0
+
+
+def missed_comments(post_id, after_id):
+    return (
+        Comment.objects.filter(post_id=post_id, id__gt=after_id)
+        .select_related('author').order_by('id')
+    )
+
+
+def check_updates(post_id, mode):
+    if (settings.COMMENT_UPDATES != mode
+            or not Post.objects.is_visible(post_id)):
+        raise Http404
+
+
+def comment_stream(request, post_id):
+    """Server-sent events with the comments added to a post.
+
+    A stream lasts COMMENT_STREAM_DURATION seconds so it never pins a worker
+    thread for long; EventSource reconnects with Last-Event-ID and gets the
+    comments it missed from the database.
+    """
+    check_updates(post_id, 'stream')
+    last_id = get_last_event_id(request, post_id)
+    deadline = time.monotonic() + settings.COMMENT_STREAM_DURATION
+    broker = get_broker()
+
+    def events():
+        nonlocal last_id
+        yield 'retry: 3000\n\n'
+        for comment in missed_comments(post_id, last_id):
+            last_id = comment.id
+            yield format_event(comment_payload(comment))
+        close_old_connections()
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            payloads = broker.wait(
+                post_id, last_id,
+                min(remaining, settings.COMMENT_STREAM_KEEPALIVE)
+            )
+            for payload in payloads:
+                last_id = payload['id']
+                yield format_event(payload)
+            if not payloads:
+                yield ': keepalive\n\n'
+
+    response = StreamingHttpResponse(
+        events(), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def comment_poll(request, post_id):
+    """Long polling: the comments after ?after=, waiting for new ones.
+
+    Answers at once when comments were missed, otherwise after the next
+    comment or COMMENT_POLL_TIMEOUT seconds; the page asks again right away.
+    """
+    check_updates(post_id, 'poll')
+    last_id = get_last_event_id(request, post_id)
+    payloads = [
+        comment_payload(comment)
+        for comment in missed_comments(post_id, last_id)
+    ] or get_broker().wait(post_id, last_id, settings.COMMENT_POLL_TIMEOUT)
+    response = JsonResponse(
+        {'comments': payloads}, encoder=DjangoJSONEncoder,
+        json_dumps_params={'ensure_ascii': False},
+    )
+    response['Cache-Control'] = 'no-cache'
+    return response
@@ -0,0 +1,32 @@
+from django.utils.text import Truncator
+
+EXCERPT_WORDS = 10
+EXCERPT_LENGTH = 256
+BACKFILL_BATCH_SIZE = 1000
+
+
+def make_excerpt(text):
+    # Same suffix as the truncatewords filter the templates used before.
+    excerpt = Truncator(text).words(EXCERPT_WORDS, truncate=' …')
+    return Truncator(excerpt).chars(EXCERPT_LENGTH)
+
+
+def backfill_excerpts(model, batch_size=BACKFILL_BATCH_SIZE):
+    """Recompute excerpts batch by batch, yielding the rows updated.
+
+    Takes the model as an argument so data migrations can pass the
+    historical one, whose default manager is not called objects.
+    """
+    last_id = 0
+    while True:
+        posts = list(
+            model._default_manager.filter(id__gt=last_id)
+            .order_by('id').only('id', 'text')[:batch_size]
+        )
+        if not posts:
+            return
+        for post in posts:
+            post.excerpt = make_excerpt(post.text)
+        model._default_manager.bulk_update(posts, ['excerpt'])
+        last_id = posts[-1].id
+        yield len(posts)
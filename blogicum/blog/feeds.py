@@ -0,0 +1,232 @@
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.db.models import Min
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.template.defaultfilters import truncatewords
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date, quote_etag
+
+from .models import Category, Post, User
+from .sitemaps import get_site_root
+
+FEED_SIZE = 20
+FEED_GENERATION_KEY = 'feeds:generation'
+
+
+class PostFeed(Feed):
+    title = 'Блогикум'
+    description = 'Новые публикации'
+
+    def link(self):
+        return reverse('blog:index')
+
+    def get_posts(self, obj):
+        return Post.objects.visible()
+
+    def get_scope(self, request, *args, **kwargs):
+        """Generation scope: the site feed follows every post change."""
+        return ()
+
+    def items(self, obj):
+        return (
+            self.get_posts(obj)
+            .select_related('author', 'category')
+            .order_by('-pub_date')[:FEED_SIZE]
+        )
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return truncatewords(item.text, 30)
+
+    def item_link(self, item):
+        return reverse('blog:post_detail', args=[item.id])
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_updateddate(self, item):
+        return max(item.pub_date, item.updated_at)
+
+    def item_author_name(self, item):
+        return item.author.username
+
+    def item_categories(self, item):
+        return [item.category.title] if item.category else []
+
+
+class CategoryFeed(PostFeed):
+    def get_object(self, request, category_slug):
+        return get_object_or_404(
+            Category, is_published=True, slug=category_slug
+        )
+
+    def get_scope(self, request, category_slug):
+        return ('category', get_scope_id(Category, slug=category_slug))
+
+    def title(self, obj):
+        return f'Блогикум: {obj.title}'
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse('blog:category_posts', args=[obj.slug])
+
+    def get_posts(self, obj):
+        return Post.objects.visible().filter(category=obj)
+
+
+class AuthorFeed(PostFeed):
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def get_scope(self, request, username):
+        return ('author', get_scope_id(User, username=username))
+
+    def title(self, obj):
+        return f'Блогикум: @{obj.username}'
+
+    def description(self, obj):
+        return f'Публикации пользователя {obj.username}'
+
+    def link(self, obj):
+        return reverse('blog:profile', args=[obj.username])
+
+    def get_posts(self, obj):
+        return Post.objects.visible().filter(author=obj)
+
+
+class AtomPostFeed(PostFeed):
+    feed_type = Atom1Feed
+    subtitle = PostFeed.description
+
+
+class AtomCategoryFeed(CategoryFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
+
+
+class AtomAuthorFeed(AuthorFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
+
+
+def get_generation_key(scope):
+    return ':'.join((FEED_GENERATION_KEY, *map(str, scope)))
+
+
+def invalidate_feeds(categories=(), authors=()):
+    """Start new generations for the site and the given feeds.
+
+    Page counts, page validators and the site feed follow the site-wide
+    generation; category and author feeds only follow their own.
+    """
+    scopes = [
+        (),
+        *(('category', pk) for pk in categories if pk is not None),
+        *(('author', pk) for pk in authors if pk is not None),
+    ]
+    cache.set_many(
+        {get_generation_key(scope): uuid.uuid4().hex for scope in scopes},
+        None
+    )
+
+
+def get_generation(*scope):
+    """Token that changes whenever a post in the scope is changed.
+
+    Without a scope it changes with every post or category change.
+    """
+    return cache.get_or_set(
+        get_generation_key(scope), uuid.uuid4().hex, None
+    )
+
+
+def get_scope_id_key(model, field, value):
+    return f'feeds:ids:{model._meta.label_lower}:{field}:{value}'
+
+
+def get_scope_id(model, **lookup):
+    """Primary key behind a feed URL, cached so polls skip the database."""
+    (field, value), = lookup.items()
+    key = get_scope_id_key(model, field, value)
+    pk = cache.get(key)
+    if pk is None:
+        pk = model.objects.filter(**lookup).values_list(
+            'pk', flat=True
+        ).first()
+        if pk is None:
+            raise Http404
+        cache.set(key, pk, settings.FEED_CACHE_TIMEOUT)
+    return pk
+
+
+def get_cache_timeout():
+    """Keep a rendered feed until the next scheduled post goes live."""
+    next_pub_date = Post.objects.filter(
+        is_published=True, pub_date__gt=timezone.now()
+    ).aggregate(next_pub_date=Min('pub_date'))['next_pub_date']
+    if next_pub_date is None:
+        return settings.FEED_CACHE_TIMEOUT
+    seconds = (next_pub_date - timezone.now()).total_seconds()
+    return max(1, min(int(seconds), settings.FEED_CACHE_TIMEOUT))
+
+
+def render_feed(feed, request, *args, **kwargs):
+    obj = feed.get_object(request, *args, **kwargs)
+    feedgen = feed.get_feed(obj, request)
+    content = feedgen.writeString('utf-8').encode()
+    return {
+        'content': content,
+        'content_type': feedgen.content_type,
+        'etag': quote_etag(hashlib.md5(content).hexdigest()),
+        'last_modified': int(feedgen.latest_post_date().timestamp()),
+    }
+
+
+def cached_feed(feed_class):
+    """Serve a feed pre-rendered from the cache with conditional GET.
+
+    A post change bumps the generation of the site feed and of its
+    category and author feeds only, so aggregators polling an unchanged
+    feed cost a few cache reads and usually a 304.
+    """
+    feed = feed_class()
+
+    def view(request, *args, **kwargs):
+        generation = get_generation(*feed.get_scope(request, *args, **kwargs))
+        # Item links are absolute, built from the request's scheme and host.
+        key = (f'feeds:{get_site_root(request)}:{generation}:'
+               f'{feed_class.__name__}:{request.path}')
+        entry = cache.get(key)
+        if entry is None:
+            entry = render_feed(feed, request, *args, **kwargs)
+            cache.set(key, entry, get_cache_timeout())
+        response = get_conditional_response(
+            request,
+            etag=entry['etag'],
+            last_modified=entry['last_modified'],
+        )
+        if response is None:
+            response = HttpResponse(
+                entry['content'], content_type=entry['content_type']
+            )
+        response['ETag'] = entry['etag']
+        response['Last-Modified'] = http_date(entry['last_modified'])
+        return response
+
+    return view
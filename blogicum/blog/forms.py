@@ -1,7 +1,9 @@
 from django import forms
 from django.contrib.auth.models import User
+from django.urls import reverse_lazy
 
 from .models import Post, Comment
+from .widgets import LookupSelect
 
 
 class PostForm(forms.ModelForm):
@@ -11,7 +13,9 @@ class PostForm(forms.ModelForm):
         widgets = {
             'pub_date': forms.DateTimeInput(
                 attrs={'type': 'datetime-local'}
-            )
+            ),
+            'location': LookupSelect(reverse_lazy('api:location_lookup')),
+            'category': LookupSelect(reverse_lazy('api:category_lookup')),
         }
     image = forms.ImageField(required=False)
 
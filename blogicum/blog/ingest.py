@@ -0,0 +1,154 @@
+import logging
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+
+from core.queue import SpoolQueue
+from core.tasks import retry_delay
+from .models import Comment, Post, User
+from .signals import comments_ingested
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFull(Exception):
+    pass
+
+
+@lru_cache(maxsize=None)
+def get_comment_queue():
+    return SpoolQueue('comments')
+
+
+@lru_cache(maxsize=None)
+def get_dead_letter_queue():
+    return SpoolQueue('comments.dead')
+
+
+def enqueue_comment(post_id, author_id, text):
+    queue = get_comment_queue()
+    if queue.stats()['depth'] >= settings.COMMENT_QUEUE_MAX_DEPTH:
+        raise QueueFull
+    queue.put({'post_id': post_id, 'author_id': author_id, 'text': text})
+
+
+def build_comment(message):
+    # The spool stamps every message when the comment is submitted.
+    return Comment(
+        **message.payload,
+        created_at=datetime.fromtimestamp(message.created_at, timezone.utc),
+    )
+
+
+def insert_comments(comments):
+    """Insert comments in as few statements as the backend allows.
+
+    Rows go through the raw insert loaddata uses, which writes created_at
+    as submitted instead of letting auto_now_add overwrite it. Backends
+    that return ids from a bulk insert get one statement per batch. SQLite
+    returns none but holds its database-wide write lock from the first
+    insert to the commit, so the newest rows are the ones just written.
+    Other backends insert row by row and read each id back.
+    """
+    fields = [
+        field for field in Comment._meta.concrete_fields
+        if field is not Comment._meta.pk
+    ]
+    returning = Comment._meta.db_returning_fields
+    ops = connection.ops
+    batch_size = max(ops.bulk_batch_size(fields, comments), 1)
+    rows = []
+    with transaction.atomic():
+        for start in range(0, len(comments), batch_size):
+            batch = comments[start:start + batch_size]
+            if connection.features.can_return_rows_from_bulk_insert:
+                rows += Comment.objects._insert(
+                    batch, fields, returning_fields=returning, raw=True
+                )
+            elif connection.vendor == 'sqlite':
+                Comment.objects._insert(batch, fields, raw=True)
+                rows += reversed(list(Comment.objects.order_by(
+                    '-id'
+                ).values_list('id')[:len(batch)]))
+            else:
+                for comment in batch:
+                    rows += Comment.objects._insert(
+                        [comment], fields, returning_fields=returning,
+                        raw=True
+                    )
+    for comment, (pk,) in zip(comments, rows):
+        comment.pk = pk
+        comment._state.adding = False
+        comment._state.db = connection.alias
+    return comments
+
+
+def fail_message(queue, message, error):
+    """Retry a message later or, after TASK_MAX_ATTEMPTS, dead-letter it."""
+    if message.attempts < settings.TASK_MAX_ATTEMPTS:
+        queue.retry(message.id, retry_delay(message.attempts))
+        return
+    logger.error(
+        'Comment message %d failed %d times, moved to the dead-letter queue',
+        message.id, message.attempts,
+    )
+    get_dead_letter_queue().put({**message.payload, 'error': repr(error)})
+    queue.ack([message.id])
+
+
+def ingest_batch(batch_size):
+    """Insert one batch of queued comments with insert_comments().
+
+    Returns the number of messages taken from the queue. Comments for posts
+    or authors deleted in the meantime are dropped. When the batch insert
+    fails, messages are inserted one by one so a bad one is retried and
+    finally dead-lettered instead of blocking the queue.
+    """
+    queue = get_comment_queue()
+    messages = queue.claim(batch_size)
+    if not messages:
+        return 0
+    post_ids = set(
+        Post.objects.filter(
+            id__in={message.payload['post_id'] for message in messages}
+        ).values_list('id', flat=True)
+    )
+    author_ids = set(
+        User.objects.filter(
+            id__in={message.payload['author_id'] for message in messages}
+        ).values_list('id', flat=True)
+    )
+    valid = [
+        message for message in messages
+        if message.payload['post_id'] in post_ids
+        and message.payload['author_id'] in author_ids
+    ]
+    done = [message.id for message in messages if message not in valid]
+    comments = []
+    if valid:
+        try:
+            comments = insert_comments(list(map(build_comment, valid)))
+            done += [message.id for message in valid]
+        except DatabaseError:
+            logger.warning(
+                'Batch insert failed, inserting one by one', exc_info=True
+            )
+            for message in valid:
+                try:
+                    comments += insert_comments([build_comment(message)])
+                    done.append(message.id)
+                except DatabaseError as error:
+                    fail_message(queue, message, error)
+    queue.ack(done)
+    if comments:
+        # Raw inserts send no post_save, counters and caches listen here.
+        comments_ingested.send(sender=Comment, comments=comments)
+    lag = time.time() - min(message.created_at for message in messages)
+    logger.info(
+        'Ingested %d comments (%d dropped), oldest waited %.2fs',
+        len(comments), len(messages) - len(valid), lag,
+    )
+    return len(messages)
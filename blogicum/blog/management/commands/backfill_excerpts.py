@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from blog.excerpts import BACKFILL_BATCH_SIZE, backfill_excerpts
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Recompute the stored excerpt of every post in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=BACKFILL_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        for updated in backfill_excerpts(Post, options['batch_size']):
+            total += updated
+            self.stdout.write(f'{total} posts updated')
+        self.stdout.write(self.style.SUCCESS(f'Done, {total} posts'))
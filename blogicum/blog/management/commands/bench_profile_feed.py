@@ -0,0 +1,56 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+
+from blog.models import Post, User
+from core.bench import latency_columns, latency_header
+
+
+class Command(BaseCommand):
+    help = ("Compare the owner's profile feed query with the one it "
+            'replaced.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--username', help='Author to benchmark, the most active one '
+                               'by default.'
+        )
+        parser.add_argument('--runs', type=int, default=200)
+        parser.add_argument(
+            '--explain', action='store_true',
+            help='Print the query plans as well.',
+        )
+
+    def handle(self, *args, **options):
+        user = self.get_user(options['username'])
+        page = slice(0, settings.ITEM_PER_PAGE)
+        querysets = {
+            'before': lambda: user.posts(
+                manager='published'
+            ).with_related_data().filter(author__username=user.username),
+            'owner_feed': lambda: Post.objects.owner_feed(user.id),
+        }
+        self.stdout.write(
+            f'{user.username}: {user.posts.count()} posts\n'
+            f'{"query":<12}{latency_header()}'
+        )
+        for name, make_queryset in querysets.items():
+            if options['explain']:
+                self.stdout.write(make_queryset()[page].explain())
+            timings = []
+            for _ in range(options['runs']):
+                started = time.perf_counter()
+                list(make_queryset()[page])
+                timings.append(time.perf_counter() - started)
+            self.stdout.write(f'{name:<12}{latency_columns(timings)}')
+
+    def get_user(self, username):
+        users = User.objects.all()
+        if username:
+            users = users.filter(username=username)
+        user = users.annotate(total=Count('posts')).order_by('-total').first()
+        if user is None:
+            raise CommandError('No such user.')
+        return user
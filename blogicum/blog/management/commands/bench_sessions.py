@@ -0,0 +1,63 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from blog.models import User
+from core.bench import latency_columns, latency_header
+
+
+class Command(BaseCommand):
+    help = ('Compare authenticated feed latency and session queries '
+            'under each configured session engine.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', help='User to log in as.')
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument(
+            '--engines', nargs='+', default=list(settings.SESSION_ENGINES),
+            choices=list(settings.SESSION_ENGINES),
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(is_active=True)
+        if options['username']:
+            users = users.filter(username=options['username'])
+        user = users.order_by('id').first()
+        if user is None:
+            raise CommandError('No active user to log in as.')
+        url = reverse('blog:index')
+        self.stdout.write(
+            f'{"engine":<16}{latency_header()}'
+            f'{"session queries":>18}'
+        )
+        for name in options['engines']:
+            with override_settings(
+                SESSION_ENGINE=settings.SESSION_ENGINES[name]
+            ):
+                timings, session_queries = self.run_engine(
+                    user, url, options['requests']
+                )
+            self.stdout.write(
+                f'{name:<16}{latency_columns(timings)}'
+                f'{session_queries / len(timings):>18.2f}'
+            )
+
+    def run_engine(self, user, url, requests):
+        client = Client(HTTP_HOST=settings.ALLOWED_HOSTS[0])
+        client.force_login(user)
+        client.get(url)
+        timings = []
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(requests):
+                started = time.perf_counter()
+                client.get(url)
+                timings.append(time.perf_counter() - started)
+        session_queries = sum(
+            'django_session' in query['sql'] for query in queries
+        )
+        return timings, session_queries
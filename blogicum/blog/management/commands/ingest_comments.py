@@ -0,0 +1,59 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from blog.ingest import get_comment_queue, get_dead_letter_queue, ingest_batch
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Drain the queued comments into the database in batches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Drain what is queued now and exit.',
+        )
+        parser.add_argument(
+            '--stats', action='store_true',
+            help='Print the queue depth, the age of the oldest comment and '
+                 'the dead-letter queue depth.',
+        )
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.write_stats()
+            return
+        last_report = time.monotonic()
+        while True:
+            try:
+                taken = ingest_batch(options['batch_size'])
+            except Exception as error:
+                if options['once']:
+                    raise CommandError(f'Ingestion failed: {error!r}')
+                # Claimed messages come back when their lease runs out.
+                logger.exception('Ingestion failed, retrying')
+                close_old_connections()
+                taken = 0
+            if not taken:
+                if options['once']:
+                    return
+                time.sleep(settings.COMMENT_QUEUE_POLL_INTERVAL)
+            if time.monotonic() - last_report >= 60:
+                self.write_stats()
+                last_report = time.monotonic()
+
+    def write_stats(self):
+        stats = get_comment_queue().stats()
+        dead = get_dead_letter_queue().stats()
+        self.stdout.write(
+            f'depth={stats["depth"]} '
+            f'max_depth={settings.COMMENT_QUEUE_MAX_DEPTH} '
+            f'oldest_age={stats["oldest_age"]:.2f}s '
+            f'dead={dead["depth"]}'
+        )
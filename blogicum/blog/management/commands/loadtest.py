@@ -0,0 +1,63 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.request import urlopen
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.bench import latency_columns, latency_header
+
+PERCENTS = (50, 95, 99)
+
+
+class Command(BaseCommand):
+    help = ('Load a running server and report throughput and tail latency, '
+            'e.g. to compare the WSGI and ASGI deployments.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'targets', nargs='+', metavar='NAME=URL',
+            help='Targets to compare, e.g. wsgi=http://127.0.0.1:8000/',
+        )
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--concurrency', type=int, default=32)
+        parser.add_argument('--timeout', type=float, default=30)
+
+    def handle(self, *args, **options):
+        targets = []
+        for target in options['targets']:
+            name, sep, url = target.partition('=')
+            if not sep:
+                raise CommandError(f'Expected NAME=URL, got {target!r}.')
+            targets.append((name, url))
+        self.stdout.write(
+            f'{"target":<12}{"req/s":>10}{latency_header(PERCENTS)}'
+            f'{"errors":>8}'
+        )
+        for name, url in targets:
+            timings, errors, elapsed = self.run_target(url, options)
+            self.stdout.write(
+                f'{name:<12}'
+                f'{len(timings) / elapsed:>10.1f}'
+                f'{latency_columns(timings, PERCENTS, decimals=1)}'
+                f'{errors:>8}'
+            )
+
+    def run_target(self, url, options):
+        def fetch(_):
+            started = time.perf_counter()
+            try:
+                with urlopen(url, timeout=options['timeout']) as response:
+                    response.read()
+            except (HTTPError, URLError, OSError):
+                return None
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options['concurrency']) as pool:
+            results = list(pool.map(fetch, range(options['requests'])))
+        elapsed = time.perf_counter() - started
+        timings = [result for result in results if result is not None]
+        if not timings:
+            raise CommandError(f'Every request to {url} failed.')
+        return timings, len(results) - len(timings), elapsed
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from blog.scheduler import Scheduler, publish_due
+
+
+class Command(BaseCommand):
+    help = 'Send post_published events when scheduled posts go live.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Catch up on posts that went live and exit.',
+        )
+        parser.add_argument(
+            '--rescan-interval', type=int,
+            help='Seconds between reloads of the upcoming posts.',
+        )
+
+    def handle(self, *args, **options):
+        if options['once']:
+            posts = publish_due()
+            self.stdout.write(f'{len(posts)} posts published')
+            return
+        Scheduler(options['rescan_interval']).run()
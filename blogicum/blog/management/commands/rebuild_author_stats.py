@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from blog.counters import REBUILD_BATCH_SIZE, rebuild_author_stats
+
+
+class Command(BaseCommand):
+    help = 'Recompute post and comment totals of every author.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=REBUILD_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        rebuilt = rebuild_author_stats(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{rebuilt} authors rebuilt'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from blog.counters import recount_categories
+
+
+class Command(BaseCommand):
+    help = 'Recompute post_count and last_post_at of every category.'
+
+    def handle(self, *args, **options):
+        updated = recount_categories()
+        self.stdout.write(
+            self.style.SUCCESS(f'{updated} categories recounted')
+        )
@@ -0,0 +1,43 @@
+# Generated by Django 3.2.16 on 2026-10-19 19:54
+
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+# Frozen copies of blog.excerpts: later edits there must not change
+# what this migration writes.
+EXCERPT_WORDS = 10
+EXCERPT_LENGTH = 256
+BATCH_SIZE = 1000
+
+
+def fill_excerpts(apps, schema_editor):
+    manager = apps.get_model('blog', 'Post')._default_manager
+    last_id = 0
+    while True:
+        posts = list(
+            manager.filter(id__gt=last_id)
+            .order_by('id').only('id', 'text')[:BATCH_SIZE]
+        )
+        if not posts:
+            return
+        for post in posts:
+            excerpt = Truncator(post.text).words(EXCERPT_WORDS, truncate=' …')
+            post.excerpt = Truncator(excerpt).chars(EXCERPT_LENGTH)
+        manager.bulk_update(posts, ['excerpt'])
+        last_id = posts[-1].id
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_lookup_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=256, verbose_name='Начало текста'),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 3.2.16 on 2026-10-19 19:57
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+
+def count_posts(apps, schema_editor):
+    # Frozen copy of blog.counters.recount_categories(): later edits there
+    # must not change what this migration writes.
+    posts = apps.get_model('blog', 'Post')._default_manager.filter(
+        category=OuterRef('pk'),
+        is_published=True,
+        pub_date__lte=timezone.now(),
+    ).order_by().values('category')
+    apps.get_model('blog', 'Category')._default_manager.update(
+        post_count=Coalesce(
+            Subquery(
+                posts.annotate(total=Count('id')).values('total'),
+                output_field=IntegerField()
+            ),
+            0
+        ),
+        last_post_at=Subquery(
+            posts.annotate(latest=Max('pub_date')).values('latest')
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_post_excerpt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='last_post_at',
+            field=models.DateTimeField(editable=False, null=True, verbose_name='Последняя публикация'),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='post_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Публикаций'),
+        ),
+        migrations.RunPython(count_posts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,82 @@
+# Generated by Django 3.2.16 on 2026-10-19 19:58
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, Max
+from django.utils import timezone
+
+# Frozen copy of blog.counters.rebuild_author_stats(): later edits there
+# must not change what this migration writes.
+BATCH_SIZE = 1000
+
+
+def grouped(queryset, *aggregates):
+    rows = queryset.order_by().values('author').annotate(
+        *aggregates
+    ).values_list('author', *(aggregate.default_alias
+                              for aggregate in aggregates))
+    return {row[0]: row[1:] for row in rows}
+
+
+def fill_author_stats(apps, schema_editor):
+    stats_model = apps.get_model('blog', 'AuthorStats')
+    posts_model = apps.get_model('blog', 'Post')
+    comments_model = apps.get_model('blog', 'Comment')
+    users = apps.get_model(settings.AUTH_USER_MODEL).objects.order_by(
+        'id'
+    ).values_list('id', flat=True)
+    now = timezone.now()
+    last_id = 0
+    while True:
+        ids = list(users.filter(id__gt=last_id)[:BATCH_SIZE])
+        if not ids:
+            return
+        last_id = ids[-1]
+        posts = posts_model._default_manager.filter(author_id__in=ids)
+        published = grouped(
+            posts.filter(is_published=True, pub_date__lte=now), Count('id')
+        )
+        written = grouped(posts, Max('created_at'))
+        comments = grouped(
+            comments_model._default_manager.filter(author_id__in=ids),
+            Count('id'), Max('created_at'),
+        )
+        stats = []
+        for user_id in ids:
+            comment_count, last_comment = comments.get(user_id, (0, None))
+            last_post, = written.get(user_id, (None,))
+            stats.append(stats_model(
+                user_id=user_id,
+                post_count=published.get(user_id, (0,))[0],
+                comment_count=comment_count,
+                last_activity=max(
+                    filter(None, (last_post, last_comment)), default=None
+                ),
+            ))
+        stats_model.objects.bulk_create(stats)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('blog', '0014_category_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                ('post_count', models.PositiveIntegerField(default=0, verbose_name='Публикаций')),
+                ('comment_count', models.PositiveIntegerField(default=0, verbose_name='Комментариев')),
+                ('last_activity', models.DateTimeField(null=True, verbose_name='Последняя активность')),
+            ],
+            options={
+                'verbose_name': 'статистика автора',
+                'verbose_name_plural': 'Статистика авторов',
+            },
+        ),
+        migrations.RunPython(fill_author_stats, migrations.RunPython.noop),
+    ]
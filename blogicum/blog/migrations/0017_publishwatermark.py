@@ -0,0 +1,24 @@
+# Generated by Django 3.2.16 on 2026-10-19 20:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_post_author_pub_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PublishWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('published_until', models.DateTimeField(verbose_name='Опубликовано до')),
+            ],
+            options={
+                'verbose_name': 'отметка планировщика',
+                'verbose_name_plural': 'Отметки планировщика',
+            },
+        ),
+    ]
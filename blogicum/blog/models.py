@@ -2,9 +2,10 @@ import datetime as dt
 
 from django.db import models
 from django.contrib.auth import get_user_model
-from django.db.models import Count
+from django.db.models import Count, Prefetch
 
 from core.models import PublishedModel, TitleModel
+from .excerpts import EXCERPT_LENGTH, make_excerpt
 
 
 class Category(PublishedModel, TitleModel):
@@ -16,10 +17,28 @@ class Category(PublishedModel, TitleModel):
                   'разрешены символы латиницы, цифры, '
                   'дефис и подчёркивание.'
     )
+    post_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Публикаций'
+    )
+    last_post_at = models.DateTimeField(
+        null=True,
+        editable=False,
+        verbose_name='Последняя публикация'
+    )
 
     class Meta:
         verbose_name = 'категория'
         verbose_name_plural = 'Категории'
+        # Pattern ops let PostgreSQL serve LIKE 'prefix%' lookups.
+        indexes = (
+            models.Index(
+                fields=('title',),
+                name='category_title_prefix',
+                opclasses=('varchar_pattern_ops',)
+            ),
+        )
 
     def __str__(self):
         return self.title
@@ -31,6 +50,13 @@ class Location(PublishedModel):
     class Meta:
         verbose_name = 'местоположение'
         verbose_name_plural = 'Местоположения'
+        indexes = (
+            models.Index(
+                fields=('name',),
+                name='location_name_prefix',
+                opclasses=('varchar_pattern_ops',)
+            ),
+        )
 
     def __str__(self):
         return self.name
@@ -38,22 +64,68 @@ class Location(PublishedModel):
 
 User = get_user_model()
 
+# Columns the counters and feed caches follow, compared on every save.
+POST_STATE_FIELDS = ('category_id', 'author_id', 'is_published', 'pub_date')
+# Everything includes/post_card.html renders.
+POST_CARD_FIELDS = (
+    'title',
+    'excerpt',
+    'image',
+    'pub_date',
+    'is_published',
+    'author__username',
+    'location__name',
+    'location__is_published',
+    'category__title',
+    'category__slug',
+    'category__is_published',
+)
+
 
 class PostQuerySet(models.QuerySet):
 
+    def visible(self):
+        return self.filter(
+            is_published=True,
+            category__is_published=True,
+            pub_date__lte=dt.datetime.now(tz=dt.timezone.utc)
+        )
+
+    def visible_to(self, user):
+        """Visible posts plus every post of the user, drafts included."""
+        if user.is_anonymous:
+            return self.visible()
+        return self.visible() | self.filter(author_id=user.id)
+
+    def is_visible(self, pk) -> bool:
+        """Cheap visibility probe for write views: no prefetch or counts."""
+        return self.visible().filter(pk=pk).exists()
+
     def published(self):
+        return self.visible().with_related_data()
+
+    def for_list(self):
+        """Feed pages: only the card columns, no comments prefetch."""
         return (
-            self.with_related_data()
-            .filter(
-                is_published=True,
-                category__is_published=True,
-                pub_date__lte=dt.datetime.now(tz=dt.timezone.utc)
-            )
+            self.select_related('location', 'author', 'category')
+            .only(*POST_CARD_FIELDS)
+            .annotate(comment_count=Count('comments'))
+            .order_by('-pub_date')
         )
 
+    def owner_feed(self, user_id):
+        """All posts of an author, drafts and scheduled ones included.
+
+        Filters on author_id only, so it is served by post_author_pub_date.
+        """
+        return self.filter(author_id=user_id).for_list()
+
     def with_related_data(self):
         return (
-            self.prefetch_related('comments')
+            self.prefetch_related(Prefetch(
+                'comments',
+                queryset=Comment.objects.select_related('author')
+            ))
             .select_related('location', 'author', 'category')
             .annotate(comment_count=Count('comments'))
             .order_by('-pub_date')
@@ -70,6 +142,12 @@ class PublishedPostManager(models.Manager):
 
 class Post (PublishedModel, TitleModel):
     text = models.TextField(verbose_name='Текст')
+    excerpt = models.CharField(
+        max_length=EXCERPT_LENGTH,
+        blank=True,
+        editable=False,
+        verbose_name='Начало текста'
+    )
     image = models.ImageField('Фото', upload_to='blog_images', blank=True)
     pub_date = models.DateTimeField(
         verbose_name='Дата и время публикации',
@@ -95,17 +173,47 @@ class Post (PublishedModel, TitleModel):
         null=True,
         verbose_name='Категория'
     )
-    objects = models.Manager()
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='Изменено')
+    objects = PostQuerySet.as_manager()
     published = PublishedPostManager()
 
     class Meta:
         verbose_name = 'публикация'
         default_related_name = 'posts'
         verbose_name_plural = 'Публикации'
+        indexes = (
+            models.Index(
+                fields=('author', '-pub_date'),
+                name='post_author_pub_date'
+            ),
+        )
 
     def __str__(self):
         return self.title
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        post = super().from_db(db, field_names, values)
+        # Saves compare with the row as loaded instead of reading it again;
+        # rows loaded without the state columns are read on save.
+        if set(POST_STATE_FIELDS) <= set(field_names):
+            post._saved_state = tuple(
+                getattr(post, field) for field in POST_STATE_FIELDS
+            )
+        return post
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.__dict__.pop('_saved_state', None)
+
+    def save(self, *args, **kwargs):
+        if 'text' not in self.get_deferred_fields():
+            self.excerpt = make_excerpt(self.text)
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None and 'text' in update_fields:
+                kwargs['update_fields'] = {*update_fields, 'excerpt'}
+        super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     text = models.TextField(
@@ -132,3 +240,48 @@ class Comment(models.Model):
 
     def __str__(self):
         return self.text
+
+
+class AuthorStats(models.Model):
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name='Пользователь'
+    )
+    post_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Публикаций'
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Комментариев'
+    )
+    last_activity = models.DateTimeField(
+        null=True,
+        verbose_name='Последняя активность'
+    )
+
+    class Meta:
+        verbose_name = 'статистика автора'
+        verbose_name_plural = 'Статистика авторов'
+
+    def __str__(self):
+        return str(self.user_id)
+
+
+class PublishWatermark(models.Model):
+    """How far the scheduler has sent post_published events.
+
+    A single row shared by the web and scheduler processes.
+    """
+
+    published_until = models.DateTimeField('Опубликовано до')
+
+    class Meta:
+        verbose_name = 'отметка планировщика'
+        verbose_name_plural = 'Отметки планировщика'
+
+    def __str__(self):
+        return str(self.published_until)
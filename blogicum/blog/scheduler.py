@@ -0,0 +1,87 @@
+import heapq
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import Post, PublishWatermark
+from .signals import post_published
+
+logger = logging.getLogger(__name__)
+
+
+def publish_due(now=None):
+    """Send post_published for posts that went live since the last call.
+
+    The watermark row remembers how far events were sent, so a restarted
+    worker catches up on posts that went live while it was down. Without
+    a watermark it starts from now. The event and the watermark move in
+    one transaction.
+    """
+    now = now or timezone.now()
+    with transaction.atomic():
+        watermark = PublishWatermark.objects.select_for_update().first()
+        if watermark is None:
+            PublishWatermark.objects.create(published_until=now)
+            return []
+        if watermark.published_until >= now:
+            return []
+        posts = list(Post.objects.filter(
+            is_published=True,
+            pub_date__gt=watermark.published_until,
+            pub_date__lte=now,
+        ).order_by('pub_date'))
+        watermark.published_until = now
+        watermark.save(update_fields=['published_until'])
+        if posts:
+            post_published.send(sender=Post, posts=posts)
+            logger.info('Published %d scheduled posts', len(posts))
+    return posts
+
+
+class Scheduler:
+    """Sleeps until the next scheduled pub_date instead of polling.
+
+    Upcoming pub_dates due before the next rescan are kept in a min-heap;
+    rescans pick up posts scheduled, moved or unpublished in the meantime.
+    """
+
+    def __init__(self, rescan_interval=None):
+        self.rescan_interval = (
+            rescan_interval or settings.SCHEDULER_RESCAN_INTERVAL
+        )
+        self.heap = []
+        self.next_rescan = 0
+
+    def rescan(self):
+        now = timezone.now()
+        horizon = now + timedelta(seconds=self.rescan_interval)
+        self.heap = list(Post.objects.filter(
+            is_published=True, pub_date__gt=now, pub_date__lte=horizon
+        ).values_list('pub_date', 'id'))
+        heapq.heapify(self.heap)
+        self.next_rescan = time.monotonic() + self.rescan_interval
+
+    def seconds_to_wakeup(self):
+        until_rescan = self.next_rescan - time.monotonic()
+        if not self.heap:
+            return max(0, until_rescan)
+        until_post = (self.heap[0][0] - timezone.now()).total_seconds()
+        return max(0, min(until_post, until_rescan))
+
+    def run_once(self):
+        if time.monotonic() >= self.next_rescan:
+            self.rescan()
+        now = timezone.now()
+        while self.heap and self.heap[0][0] <= now:
+            heapq.heappop(self.heap)
+        return publish_due(now)
+
+    def run(self):
+        while True:
+            close_old_connections()
+            self.run_once()
+            time.sleep(self.seconds_to_wakeup())
@@ -0,0 +1,178 @@
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save
+)
+from django.dispatch import Signal, receiver
+from django.utils import timezone
+
+from . import counters, events
+from .feeds import get_scope_id_key, invalidate_feeds
+from .models import POST_STATE_FIELDS, Category, Comment, Location, Post, User
+from .sitemaps import touch_section
+
+# Sent with comments=[...] after queued comments are bulk-inserted.
+comments_ingested = Signal()
+# Sent with posts=[...] by the scheduler when scheduled posts go live.
+post_published = Signal()
+
+
+def post_state(post):
+    return tuple(getattr(post, field) for field in POST_STATE_FIELDS)
+
+
+def invalidate_post_rows(*rows):
+    """Renew the feeds of the categories and authors of the state rows."""
+    rows = [row for row in rows if row is not None]
+    invalidate_feeds(
+        categories={row[0] for row in rows},
+        authors={row[1] for row in rows},
+    )
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_state(sender, instance, raw, **kwargs):
+    if raw or instance.pk is None:
+        instance._saved_state = None
+    elif not hasattr(instance, '_saved_state'):
+        # Built by hand, refreshed or loaded with deferred state columns.
+        instance._saved_state = Post.objects.filter(
+            pk=instance.pk
+        ).values_list(*POST_STATE_FIELDS).first()
+
+
+@receiver(post_save, sender=Post)
+def update_post_counters(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    saved_state = getattr(instance, '_saved_state', None)
+    invalidate_post_rows(saved_state, post_state(instance))
+    counters.move_post(saved_state, post_state(instance))
+    if created:
+        counters.bump_author(
+            instance.author_id, active_at=instance.created_at
+        )
+    instance._saved_state = post_state(instance)
+
+
+@receiver(post_delete, sender=Post)
+def release_post_counters(sender, instance, **kwargs):
+    invalidate_post_rows(post_state(instance))
+    counters.move_post(post_state(instance), None)
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def invalidate_category_feeds(sender, instance, raw=False, **kwargs):
+    # Title and visibility show in the feeds of every author in it;
+    # before a delete the posts still point at the category.
+    if raw:
+        return
+    invalidate_feeds(
+        categories=[instance.pk],
+        authors=Post.objects.filter(category=instance).order_by()
+        .values_list('author_id', flat=True).distinct(),
+    )
+    cache.delete(get_scope_id_key(Category, 'slug', instance.slug))
+    touch_section('categories')
+
+
+@receiver(post_save, sender=Location)
+@receiver(pre_delete, sender=Location)
+def touch_location_posts(sender, instance, raw=False, **kwargs):
+    # Cards show the location's name and visibility; before a delete the
+    # posts still point at it.
+    if not raw:
+        Post.objects.filter(location=instance).update(
+            updated_at=timezone.now()
+        )
+
+
+@receiver(pre_save, sender=User)
+def remember_username(sender, instance, raw, update_fields=None, **kwargs):
+    instance._old_username = None
+    if raw or instance.pk is None or (
+            update_fields is not None and 'username' not in update_fields):
+        return
+    instance._old_username = User.objects.filter(
+        pk=instance.pk
+    ).values_list('username', flat=True).first()
+
+
+@receiver(post_save, sender=User)
+def touch_renamed_author_posts(sender, instance, raw, **kwargs):
+    old_username = getattr(instance, '_old_username', None)
+    if raw or old_username in (None, instance.username):
+        return
+    posts = Post.objects.filter(author=instance)
+    invalidate_feeds(
+        categories=posts.order_by().values_list(
+            'category_id', flat=True
+        ).distinct(),
+        authors=[instance.pk],
+    )
+    posts.update(updated_at=timezone.now())
+    cache.delete(get_scope_id_key(User, 'username', old_username))
+    touch_section('profiles')
+
+
+@receiver(post_save, sender=Comment)
+def count_comment(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        counters.bump_author(
+            instance.author_id, comments=1, active_at=instance.created_at
+        )
+
+
+@receiver(post_save, sender=Comment)
+def publish_new_comment(sender, instance, created, raw, **kwargs):
+    # Every way of adding a comment reaches the live comment streams.
+    if created and not raw:
+        events.publish_comment(instance)
+
+
+@receiver(post_delete, sender=Comment)
+def uncount_comment(sender, instance, **kwargs):
+    counters.bump_author(instance.author_id, comments=-1)
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def touch_commented_post(sender, instance, raw=False, **kwargs):
+    # Comments carry no change date: mark the post page as modified.
+    if not raw:
+        Post.objects.filter(pk=instance.post_id).update(
+            updated_at=timezone.now()
+        )
+
+
+@receiver(comments_ingested)
+def touch_ingested_posts(sender, comments, **kwargs):
+    Post.objects.filter(
+        pk__in={comment.post_id for comment in comments}
+    ).update(updated_at=timezone.now())
+
+
+@receiver(comments_ingested)
+def count_ingested_comments(sender, comments, **kwargs):
+    by_author = defaultdict(list)
+    for comment in comments:
+        by_author[comment.author_id].append(comment.created_at)
+    for author_id, created in by_author.items():
+        counters.bump_author(
+            author_id, comments=len(created), active_at=max(created)
+        )
+
+
+@receiver(post_published)
+def count_published_posts(sender, posts, **kwargs):
+    # A save between pub_date and the event may have counted the post
+    # already; recounting the touched rows keeps the event idempotent.
+    categories = {post.category_id for post in posts} - {None}
+    counters.recount_categories(Category.objects.filter(id__in=categories))
+    counters.rebuild_author_stats({post.author_id for post in posts})
+    invalidate_post_rows(*map(post_state, posts))
@@ -0,0 +1,213 @@
+import time
+from abc import ABC, abstractmethod
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Max
+from django.db.models.functions import Greatest
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from .models import Category, Post, User
+
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8"?>\n'
+CONTENT_TYPE = 'application/xml; charset=utf-8'
+# reverse() per row is too slow for millions of rows: reverse once with a
+# placeholder and format the rest.
+PLACEHOLDER = '987654321'
+
+
+class SitemapSection(ABC):
+    """Rows of one model split into fixed id ranges of chunk_size rows.
+
+    A row never moves between chunks, so a chunk only changes when one of
+    its own rows does and its cached body can be reused until then.
+    """
+
+    name: str
+    url_name: str
+    url_field: str
+    lastmod = None
+    row_lastmod = None
+
+    @property
+    def chunk_size(self):
+        return settings.SITEMAP_CHUNK_SIZE
+
+    @abstractmethod
+    def get_queryset(self):
+        """Rows listed in the section."""
+
+    def get_chunks(self):
+        return (
+            self.get_queryset()
+            .annotate(chunk=F('id') / self.chunk_size)
+            .values('chunk')
+            .annotate(
+                lastmod=Max(self.lastmod),
+                total=Count('id', distinct=True)
+            )
+            .order_by('chunk')
+        )
+
+    def get_chunk_queryset(self, chunk):
+        return self.get_queryset().filter(
+            id__gte=chunk * self.chunk_size,
+            id__lt=(chunk + 1) * self.chunk_size,
+        )
+
+    def get_chunk_state(self, chunk):
+        return self.get_chunk_queryset(chunk).aggregate(
+            lastmod=Max(self.lastmod), total=Count('id', distinct=True)
+        )
+
+    def iter_rows(self, chunk):
+        return (
+            self.get_chunk_queryset(chunk)
+            .annotate(row_lastmod=self.row_lastmod or F(self.lastmod))
+            .values_list(self.url_field, 'row_lastmod')
+            .order_by('id')
+            .iterator(chunk_size=2000)
+        )
+
+    def get_url_format(self):
+        return reverse(self.url_name, args=[PLACEHOLDER]).replace(
+            PLACEHOLDER, '{}'
+        )
+
+
+class PostSection(SitemapSection):
+    name = 'posts'
+    url_name = 'blog:post_detail'
+    url_field = 'id'
+    lastmod = Greatest('pub_date', 'updated_at')
+    row_lastmod = lastmod
+
+    def get_queryset(self):
+        return Post.objects.visible()
+
+
+class CategorySection(SitemapSection):
+    name = 'categories'
+    url_name = 'blog:category_posts'
+    url_field = 'slug'
+    lastmod = 'created_at'
+
+    def get_queryset(self):
+        return Category.objects.filter(is_published=True)
+
+
+class ProfileSection(SitemapSection):
+    name = 'profiles'
+    url_name = 'blog:profile'
+    url_field = 'username'
+    lastmod = 'posts__pub_date'
+    row_lastmod = Max('posts__pub_date')
+
+    def get_queryset(self):
+        return User.objects.filter(
+            is_active=True,
+            username__regex=r'^[-a-zA-Z0-9_]+$',
+            posts__in=Post.objects.visible(),
+        )
+
+
+SECTIONS = {
+    section.name: section
+    for section in (PostSection(), CategorySection(), ProfileSection())
+}
+
+
+def get_renamed_key(name):
+    return f'sitemaps:renamed:{name}'
+
+
+def touch_section(name):
+    """Record a change of the section's URLs that its lastmod misses.
+
+    Category slugs and usernames are not part of lastmod; renaming one
+    must still move the chunk's Last-Modified and cache key.
+    """
+    cache.set(get_renamed_key(name), time.time(), None)
+
+
+def get_site_root(request):
+    """Scheme and host every <loc> starts with; part of every cache key."""
+    return request.build_absolute_uri('/')[:-1]
+
+
+def sitemap_index(request):
+    key = f'sitemaps:{get_site_root(request)}:index'
+    content = cache.get(key)
+    if content is None:
+        chunk_url = reverse(
+            'blog:sitemap_chunk', args=['section', 0]
+        ).replace('section-0', '{}-{}')
+        entries = []
+        for section in SECTIONS.values():
+            for chunk in section.get_chunks():
+                loc = request.build_absolute_uri(
+                    chunk_url.format(section.name, chunk['chunk'])
+                )
+                entries.append(
+                    f'<sitemap><loc>{escape(loc)}</loc>'
+                    f'<lastmod>{chunk["lastmod"].isoformat()}</lastmod>'
+                    '</sitemap>\n'
+                )
+        content = (
+            f'{XML_HEADER}<sitemapindex xmlns="{SITEMAP_NS}">\n'
+            + ''.join(entries)
+            + '</sitemapindex>\n'
+        )
+        cache.set(key, content, settings.SITEMAP_INDEX_CACHE_TIMEOUT)
+    return HttpResponse(content, content_type=CONTENT_TYPE)
+
+
+def stream_chunk(request, section, chunk, key):
+    base = get_site_root(request)
+    url_format = section.get_url_format()
+    parts = []
+
+    def generate():
+        for part in (XML_HEADER, f'<urlset xmlns="{SITEMAP_NS}">\n'):
+            parts.append(part)
+            yield part
+        for url_value, lastmod in section.iter_rows(chunk):
+            loc = escape(base + url_format.format(url_value))
+            part = (
+                f'<url><loc>{loc}</loc>'
+                f'<lastmod>{lastmod.isoformat()}</lastmod></url>\n'
+            )
+            parts.append(part)
+            yield part
+        parts.append('</urlset>\n')
+        yield parts[-1]
+        cache.set(key, ''.join(parts), settings.SITEMAP_CACHE_TIMEOUT)
+
+    return StreamingHttpResponse(generate(), content_type=CONTENT_TYPE)
+
+
+def sitemap_chunk(request, section, chunk):
+    if section not in SECTIONS:
+        raise Http404
+    section = SECTIONS[section]
+    state = section.get_chunk_state(chunk)
+    if not state['total']:
+        raise Http404
+    renamed = cache.get(get_renamed_key(section.name), 0)
+    last_modified = int(max(state['lastmod'].timestamp(), renamed))
+    response = get_conditional_response(request, last_modified=last_modified)
+    if response is None:
+        key = (f'sitemaps:{get_site_root(request)}:{section.name}:{chunk}:'
+               f'{last_modified}:{renamed}:{state["total"]}')
+        content = cache.get(key)
+        if content is None:
+            response = stream_chunk(request, section, chunk, key)
+        else:
+            response = HttpResponse(content, content_type=CONTENT_TYPE)
+    response['Last-Modified'] = http_date(last_modified)
+    return response
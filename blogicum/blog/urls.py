@@ -1,19 +1,65 @@
+from django.conf import settings
 from django.urls import path
 
-from . import views
+from core.asyncviews import as_async_view
+from . import events, feeds, sitemaps, views
 
 app_name = 'blog'
 
+
+def page_view(view_class):
+    if settings.ASYNC_VIEWS:
+        return as_async_view(view_class)
+    return view_class.as_view()
+
+
 urlpatterns = [
-    path('', views.IndexView.as_view(), name='index'),
+    path('', page_view(views.IndexView), name='index'),
+    path('sitemap.xml', sitemaps.sitemap_index, name='sitemap'),
+    path(
+        'category/',
+        views.CategoryListView.as_view(),
+        name='categories'
+    ),
+    path(
+        'sitemap-<slug:section>-<int:chunk>.xml',
+        sitemaps.sitemap_chunk,
+        name='sitemap_chunk'
+    ),
+    path('feed/', feeds.cached_feed(feeds.PostFeed), name='feed'),
+    path(
+        'feed/atom/',
+        feeds.cached_feed(feeds.AtomPostFeed),
+        name='feed_atom'
+    ),
+    path(
+        'category/<slug:category_slug>/feed/',
+        feeds.cached_feed(feeds.CategoryFeed),
+        name='category_feed'
+    ),
+    path(
+        'category/<slug:category_slug>/feed/atom/',
+        feeds.cached_feed(feeds.AtomCategoryFeed),
+        name='category_feed_atom'
+    ),
+    path(
+        'profile/<slug:username>/feed/',
+        feeds.cached_feed(feeds.AuthorFeed),
+        name='profile_feed'
+    ),
+    path(
+        'profile/<slug:username>/feed/atom/',
+        feeds.cached_feed(feeds.AtomAuthorFeed),
+        name='profile_feed_atom'
+    ),
     path(
         'posts/<int:id>/',
-        views.PostDetailView.as_view(),
+        page_view(views.PostDetailView),
         name='post_detail'
     ),
     path(
         'category/<slug:category_slug>/',
-        views.CategoryView.as_view(),
+        page_view(views.CategoryView),
         name='category_posts'
     ),
     path(
@@ -21,7 +67,7 @@ urlpatterns = [
         views.UserUpdateView.as_view(),
         name='edit_profile'),
     path('profile/<slug:username>/',
-         views.ProfileListView.as_view(),
+         page_view(views.ProfileListView),
          name='profile'
          ),
     path('posts/create/',
@@ -33,6 +79,16 @@ urlpatterns = [
         views.CommentCreateView.as_view(),
         name='add_comment'
     ),
+    path(
+        'posts/<int:post_id>/comments/stream/',
+        events.comment_stream,
+        name='comment_stream'
+    ),
+    path(
+        'posts/<int:post_id>/comments/poll/',
+        events.comment_poll,
+        name='comment_poll'
+    ),
     path(
         'posts/<int:post_id>/edit/',
         views.PostUpdateView.as_view(),
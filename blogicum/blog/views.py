@@ -1,8 +1,12 @@
+import hashlib
+
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.db.models import QuerySet, Model
-from django.http import Http404
+from django.db.models import Max, Model, QuerySet
+from django.http import Http404, HttpResponse
 from django.urls import reverse, reverse_lazy
 from django.shortcuts import get_object_or_404, redirect
+from django.utils.cache import patch_vary_headers
+from django.views.decorators.http import condition
 from django.views.generic import (
     CreateView,
     DeleteView,
@@ -12,6 +16,9 @@ from django.views.generic import (
 )
 
 from django.conf import settings
+from core.paginator import CachedCountPaginator, HasNextPaginator
+from .feeds import get_generation
+from .ingest import QueueFull, enqueue_comment
 from .models import Post, Category, User, Comment
 from .forms import CommentForm, PostForm, ProfileForm
 
@@ -19,6 +26,73 @@ from .forms import CommentForm, PostForm, ProfileForm
 class PaginateMixin:
     paginate_by = settings.ITEM_PER_PAGE
 
+    def get_count_cache_key(self):
+        return None
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        if settings.PAGINATION_MODE == 'has_next':
+            return HasNextPaginator(queryset, per_page, **kwargs)
+        key = self.get_count_cache_key()
+        if key is not None:
+            # Saving a post or category starts a new generation.
+            key = f'posts:count:{get_generation()}:{key}'
+        return CachedCountPaginator(
+            queryset, per_page, count_cache_key=key,
+            count_timeout=settings.PAGINATION_COUNT_TIMEOUT, **kwargs
+        )
+
+
+class ConditionalGetMixin:
+    """Answer 304 Not Modified while the posts on the page are unchanged.
+
+    Freshness is the newest pub_date and updated_at of the posts the page
+    shows plus the feed generation, which every post or category change
+    bumps. Comments touch their post's updated_at, so the check never counts
+    rows, builds the page queryset or renders.
+    """
+
+    def get_conditional_queryset(self) -> QuerySet:
+        """Posts the page shows, filtered but not joined or annotated.
+
+        Every view using the mixin must override it.
+        """
+        raise NotImplementedError
+
+    def get_freshness(self):
+        if not hasattr(self, '_freshness'):
+            self._freshness = self.get_conditional_queryset().aggregate(
+                last_post=Max('pub_date'),
+                last_update=Max('updated_at'),
+            )
+        return self._freshness
+
+    def get_etag(self, request, *args, **kwargs):
+        freshness = self.get_freshness()
+        if freshness['last_post'] is None:
+            return None
+        # The header and ownership links differ per user.
+        key = '|'.join(map(str, (
+            request.user.id, get_generation(), *freshness.values()
+        )))
+        return hashlib.md5(key.encode()).hexdigest()
+
+    def get_last_modified(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            return None
+        freshness = self.get_freshness()
+        return max(
+            filter(None, (freshness['last_post'], freshness['last_update'])),
+            default=None
+        )
+
+    def get(self, request, *args, **kwargs):
+        response = condition(
+            etag_func=self.get_etag,
+            last_modified_func=self.get_last_modified
+        )(super().get)(request, *args, **kwargs)
+        patch_vary_headers(response, ('Cookie',))
+        return response
+
 
 class DispatchBaseMixin:
     pk_url_kwarg: str
@@ -26,14 +100,25 @@ class DispatchBaseMixin:
     post_id: str
 
     def dispatch(self, request, *args, **kwargs):
-        query_set = get_object_or_404(self.model, pk=kwargs[self.pk_url_kwarg])
-        if query_set.author != request.user:
-            return redirect(
-                'blog:post_detail',
-                getattr(query_set, self.post_id)
-            )
+        if not self.requires_owner(request):
+            return super().dispatch(request, *args, **kwargs)
+        # The row is loaded once here and reused by get_object().
+        self.owned_object = get_object_or_404(
+            self.model, pk=kwargs[self.pk_url_kwarg]
+        )
+        if self.owned_object.author_id != request.user.id:
+            return self.handle_not_owner(self.owned_object)
         return super().dispatch(request, *args, **kwargs)
 
+    def get_object(self, queryset=None):
+        return self.owned_object
+
+    def requires_owner(self, request) -> bool:
+        return True
+
+    def handle_not_owner(self, query_set):
+        return redirect('blog:post_detail', getattr(query_set, self.post_id))
+
 
 class DispatchPostMixin(DispatchBaseMixin):
     pk_url_kwarg = 'post_id'
@@ -47,43 +132,78 @@ class DispatchCommentMixin(DispatchBaseMixin):
     post_id = 'post_id'
 
 
-class IndexView(PaginateMixin, ListView):
+class IndexView(ConditionalGetMixin, PaginateMixin, ListView):
     template_name = 'blog/index.html'
-    queryset = Post.published.all()
 
+    def get_queryset(self) -> QuerySet:
+        return Post.objects.visible().for_list()
+
+    def get_count_cache_key(self):
+        return 'index'
+
+    def get_conditional_queryset(self) -> QuerySet:
+        return Post.objects.visible()
 
-class CategoryView(PaginateMixin, ListView):
+
+class CategoryView(ConditionalGetMixin, PaginateMixin, ListView):
     template_name = 'blog/category.html'
     pk_url_kwarg = 'category_slug'
 
+    def get_conditional_queryset(self) -> QuerySet:
+        return Post.objects.visible().filter(
+            category__slug=self.kwargs[self.pk_url_kwarg]
+        )
+
     def get_queryset(self) -> QuerySet:
         category = get_object_or_404(
             Category,
             is_published=True,
             slug=self.kwargs[self.pk_url_kwarg]
         )
-        return category.posts(manager='published').all()
+        return Post.objects.visible().filter(category=category).for_list()
 
+    def get_count_cache_key(self):
+        return f'category:{self.kwargs[self.pk_url_kwarg]}'
 
-class PostDetailView(DetailView):
+
+class CategoryListView(PaginateMixin, ListView):
+    template_name = 'blog/categories.html'
+
+    def get_queryset(self) -> QuerySet:
+        return Category.objects.filter(is_published=True).only(
+            'title', 'slug', 'description', 'post_count', 'last_post_at'
+        ).order_by('title')
+
+
+class PostDetailView(ConditionalGetMixin, DetailView):
     template_name = 'blog/detail.html'
     pk_url_kwarg = 'id'
 
-    def get_object(self, queryset=None) -> Post:
-        post = get_object_or_404(
-            Post.published.with_related_data(),
+    def get_visible_queryset(self) -> QuerySet:
+        return Post.objects.visible_to(self.request.user).filter(
             id=self.kwargs[self.pk_url_kwarg]
         )
-        if (self.request.user != post.author
-                and post.is_published is not True):
+
+    def get_conditional_queryset(self) -> QuerySet:
+        return self.get_visible_queryset()
+
+    def get_etag(self, request, *args, **kwargs):
+        # A hidden post is a 404 before any validator is compared.
+        if self.get_freshness()['last_post'] is None:
             raise Http404
-        return post
+        return super().get_etag(request, *args, **kwargs)
+
+    def get_object(self, queryset=None) -> Post:
+        return get_object_or_404(
+            self.get_visible_queryset().with_related_data()
+        )
 
     def get_context_data(self, **kwargs):
         return {
             **super().get_context_data(**kwargs),
             'form': CommentForm(),
-            'comments': self.object.comments.all()
+            'comments': self.object.comments.all(),
+            'comment_updates': settings.COMMENT_UPDATES,
         }
 
 
@@ -91,15 +211,18 @@ class ProfileListView(PaginateMixin, ListView):
     template_name = 'blog/profile.html'
 
     def get_queryset(self, queryset=None) -> Post:
-        user = get_object_or_404(User, username=self.kwargs['username'])
-        if self.request.user == user:
-            post = user.posts(manager='published').with_related_data().filter(
-                author__username=user.username
-            )
-        else:
-            post = user.posts(manager='published').all()
+        user = get_object_or_404(
+            User.objects.select_related('stats'),
+            username=self.kwargs['username']
+        )
         self.user = user
-        return post
+        if self.request.user.id == user.id:
+            return Post.objects.owner_feed(user.id)
+        return Post.objects.visible().filter(author_id=user.id).for_list()
+
+    def get_count_cache_key(self):
+        owner = self.request.user.id == self.user.id
+        return f'profile:{self.user.id}:{owner}'
 
     def get_context_data(self, **kwargs):
         return {
@@ -134,13 +257,29 @@ class CommentCreateView(LoginRequiredMixin, CreateView):
             'blog:post_detail', kwargs={'id': self.kwargs[self.pk_url_kwarg]})
 
     def form_valid(self, form):
+        if not Post.objects.is_visible(self.kwargs[self.pk_url_kwarg]):
+            raise Http404
         form.instance.author = self.request.user
-        form.instance.post = get_object_or_404(
-            Post.published.all(),
-            id=self.kwargs[self.pk_url_kwarg]
-        )
+        form.instance.post_id = self.kwargs[self.pk_url_kwarg]
+        if settings.COMMENT_INGESTION == 'queued':
+            return self.enqueue(form)
         return super().form_valid(form)
 
+    def enqueue(self, form):
+        try:
+            enqueue_comment(
+                form.instance.post_id,
+                form.instance.author_id,
+                form.cleaned_data['text']
+            )
+        except QueueFull:
+            response = HttpResponse(
+                'Слишком много комментариев, попробуйте позже.', status=503
+            )
+            response['Retry-After'] = '30'
+            return response
+        return redirect(self.get_success_url())
+
 
 class UserUpdateView(LoginRequiredMixin, UpdateView):
     form_class = ProfileForm
@@ -181,9 +320,6 @@ class CommentUpdateView(DispatchCommentMixin, LoginRequiredMixin, UpdateView):
     template_name = 'blog/comment.html'
     pk_url_kwarg = 'comment_id'
 
-    def get_object(self, queryset=None):
-        return get_object_or_404(Comment, id=self.kwargs[self.pk_url_kwarg])
-
     def get_success_url(self):
         return reverse_lazy(
             'blog:post_detail', kwargs={'id': self.object.post_id})
@@ -193,9 +329,6 @@ class CommentDeleteView(DispatchCommentMixin, LoginRequiredMixin, DeleteView):
     template_name = 'blog/comment.html'
     pk_url_kwarg = 'comment_id'
 
-    def get_object(self, queryset=None):
-        return get_object_or_404(Comment, id=self.kwargs[self.pk_url_kwarg])
-
     def get_success_url(self):
         return reverse_lazy(
             'blog:post_detail', kwargs={'id': self.kwargs['post_id']})
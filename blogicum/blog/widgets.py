@@ -0,0 +1,37 @@
+from django import forms
+
+
+class LookupSelect(forms.Select):
+    """Select that renders only the chosen option.
+
+    Other options are fetched on demand from a JSON prefix lookup, so the
+    page does not grow with the referenced table.
+    """
+
+    def __init__(self, lookup_url, attrs=None):
+        super().__init__(attrs)
+        self.lookup_url = lookup_url
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget']['attrs']['data-lookup'] = str(self.lookup_url)
+        return context
+
+    def optgroups(self, name, value, attrs=None):
+        field = self.choices.field
+        options = []
+        if not self.is_required:
+            options.append(
+                self.create_option(name, '', field.empty_label, False, 0)
+            )
+        selected = [item for item in value if item not in field.empty_values]
+        try:
+            objects = list(field.queryset.filter(pk__in=selected))
+        except (TypeError, ValueError):
+            objects = []
+        for obj in objects:
+            options.append(self.create_option(
+                name, field.prepare_value(obj),
+                field.label_from_instance(obj), True, len(options)
+            ))
+        return [(None, options, 0)]
@@ -11,6 +11,10 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from core.startup import on_worker_start
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
 
 application = get_asgi_application()
+
+on_worker_start()
@@ -1,22 +1,40 @@
 from pathlib import Path
 
+from core.env import env_bool, env_int, env_list, env_str
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-SECRET_KEY = 'django-insecure-ao&2_x13$&7spgwx5%6s0wa7_qh0(2ek4io42^ic&%ik$(=6s3'
+# Settings are layered: the defaults below describe the development
+# profile, BLOGICUM_PROFILE=production switches the defaults to the
+# production ones, and individual environment variables override both.
+PROFILE = env_str('BLOGICUM_PROFILE', 'development')
+
+PRODUCTION = PROFILE == 'production'
+
+# Committed for development only; the production check refuses it.
+DEVELOPMENT_SECRET_KEY = (
+    'django-insecure-ao&2_x13$&7spgwx5%6s0wa7_qh0(2ek4io42^ic&%ik$(=6s3'
+)
+
+SECRET_KEY = env_str('DJANGO_SECRET_KEY', DEVELOPMENT_SECRET_KEY)
 
-DEBUG = True
+DEBUG = env_bool('DJANGO_DEBUG', not PRODUCTION)
 ITEM_PER_PAGE = 10
+# 'count' shows numbered pages with cached totals; 'has_next' never counts.
+PAGINATION_MODE = env_str('BLOGICUM_PAGINATION_MODE', 'count')
+PAGINATION_COUNT_TIMEOUT = env_int('PAGINATION_COUNT_TIMEOUT', 60)
 
-ALLOWED_HOSTS = [
+ALLOWED_HOSTS = env_list('DJANGO_ALLOWED_HOSTS', [
     'localhost',
     '127.0.0.1'
-]
+])
 
 MEDIA_ROOT = BASE_DIR / 'media'
 
 
 INSTALLED_APPS = [
     'django_bootstrap5',
+    'core.apps.CoreConfig',
     'blog.apps.BlogConfig',
     'pages.apps.PagesConfig',
     'django.contrib.admin',
@@ -57,20 +75,122 @@ TEMPLATES = [
     },
 ]
 
+# In production the cached loader keeps compiled templates in memory and
+# the worker precompiles everything from TEMPLATES_DIR and the app template
+# directories on startup.
+TEMPLATES_CACHED = env_bool('BLOGICUM_TEMPLATES_CACHED', not DEBUG)
+
+TEMPLATES_WARMUP = TEMPLATES_CACHED
+
+if TEMPLATES_CACHED:
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
+ASGI_APPLICATION = 'blogicum.asgi.application'
+
+# Serve the feed, category, post and profile pages with coroutine views;
+# only useful under an ASGI server.
+ASYNC_VIEWS = env_bool('BLOGICUM_ASYNC_VIEWS', False)
+
+ASYNC_VIEW_THREADS = env_int('BLOGICUM_ASYNC_VIEW_THREADS', 8)
+
 
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'ENGINE': env_str('DB_ENGINE', 'django.db.backends.sqlite3'),
+        'NAME': env_str('DB_NAME', str(BASE_DIR / 'db.sqlite3')),
+        'USER': env_str('DB_USER'),
+        'PASSWORD': env_str('DB_PASSWORD'),
+        'HOST': env_str('DB_HOST'),
+        'PORT': env_str('DB_PORT'),
+        # Persistent connections save a connect per request in production.
+        'CONN_MAX_AGE': env_int('DB_CONN_MAX_AGE', 60 if PRODUCTION else 0),
     }
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': env_str(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': env_str('CACHE_LOCATION', 'blogicum'),
+        'TIMEOUT': env_int('CACHE_TIMEOUT', 300),
+    }
+}
+
+FEED_CACHE_TIMEOUT = env_int('FEED_CACHE_TIMEOUT', 60 * 60)
+
+SITEMAP_CHUNK_SIZE = env_int('SITEMAP_CHUNK_SIZE', 10000)
+
+SITEMAP_CACHE_TIMEOUT = env_int('SITEMAP_CACHE_TIMEOUT', 24 * 60 * 60)
+
+SITEMAP_INDEX_CACHE_TIMEOUT = env_int('SITEMAP_INDEX_CACHE_TIMEOUT', 5 * 60)
+
+# Live comments on the post page are off unless enabled: 'stream' keeps a
+# server-sent events stream open (needs a server with spare threads),
+# 'poll' long-polls with one short request at a time.
+COMMENT_UPDATES = env_str('BLOGICUM_COMMENT_UPDATES', 'off')
+
+COMMENT_POLL_TIMEOUT = env_int('COMMENT_POLL_TIMEOUT', 10)
+
+# Live comment streams: the broker class, how long one stream stays open
+# and how often it sends keepalives (or polls, for DatabaseBroker).
+COMMENT_BROKER = env_str('COMMENT_BROKER', 'blog.events.InProcessBroker')
+
+COMMENT_STREAM_DURATION = env_int('COMMENT_STREAM_DURATION', 30)
+
+COMMENT_STREAM_KEEPALIVE = env_int('COMMENT_STREAM_KEEPALIVE', 15)
+
+COMMENT_STREAM_POLL_INTERVAL = env_int('COMMENT_STREAM_POLL_INTERVAL', 2)
+
+# 'queued' acknowledges comments at once and leaves the insert to
+# 'manage.py ingest_comments'; new comments are rejected with 503 while
+# COMMENT_QUEUE_MAX_DEPTH comments are waiting. Pair it with
+# COMMENT_BROKER=blog.events.DatabaseBroker for live comment streams.
+COMMENT_INGESTION = env_str('COMMENT_INGESTION', 'sync')
+
+COMMENT_QUEUE_MAX_DEPTH = env_int('COMMENT_QUEUE_MAX_DEPTH', 10000)
+
+COMMENT_QUEUE_POLL_INTERVAL = env_int('COMMENT_QUEUE_POLL_INTERVAL', 1)
+
+SPOOL_PATH = env_str('SPOOL_PATH', str(BASE_DIR / 'spool.sqlite3'))
+
+# 'manage.py publish_scheduled' reloads upcoming posts this often (seconds)
+# to pick up posts scheduled or rescheduled since the last scan.
+SCHEDULER_RESCAN_INTERVAL = env_int('SCHEDULER_RESCAN_INTERVAL', 60)
+
+
+# Sessions
+# https://docs.djangoproject.com/en/3.2/topics/http/sessions/
+
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+
+SESSION_ENGINE = env_str(
+    'SESSION_ENGINE', 'cached_db' if PRODUCTION else 'db'
+)
+SESSION_ENGINE = SESSION_ENGINES.get(SESSION_ENGINE, SESSION_ENGINE)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -122,10 +242,50 @@ LOGIN_REDIRECT_URL = 'blog:index'
 
 LOGIN_URL = 'login'
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+EMAIL_BACKEND = env_str(
+    'EMAIL_BACKEND', 'django.core.mail.backends.filebased.EmailBackend'
+)
 
 EMAIL_FILE_PATH = BASE_DIR / 'sent_emails'
 
 DEFAULT_FROM_EMAIL = 'arlikin@mail.ru'
 
+# EMAIL_BACKEND=core.mail.QueuedEmailBackend queues messages for
+# 'manage.py run_tasks', which sends them through TASKS_EMAIL_BACKEND.
+TASKS_EMAIL_BACKEND = env_str(
+    'TASKS_EMAIL_BACKEND', 'django.core.mail.backends.filebased.EmailBackend'
+)
+
+# Background tasks: attempts before the dead-letter queue, the first retry
+# delay (doubled on every attempt, capped) and the lease of a claimed task.
+TASK_MAX_ATTEMPTS = env_int('TASK_MAX_ATTEMPTS', 5)
+
+TASK_RETRY_DELAY = env_int('TASK_RETRY_DELAY', 10)
+
+TASK_RETRY_MAX_DELAY = env_int('TASK_RETRY_MAX_DELAY', 60 * 60)
+
+TASK_LEASE = env_int('TASK_LEASE', 5 * 60)
+
+TASK_POLL_INTERVAL = env_int('TASK_POLL_INTERVAL', 1)
+
 CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'core': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+        'blog': {
+            'handlers': ['console'],
+            'level': 'INFO',
+        },
+    },
+}
@@ -9,6 +9,7 @@ from blog.forms import ProfileForm
 urlpatterns = [
     path('', include('blog.urls', namespace='blog')),
     path('pages/', include('pages.urls', namespace='pages')),
+    path('api/', include('blog.api_urls', namespace='api')),
     path('admin/', admin.site.urls),
     path('auth/', include('django.contrib.auth.urls')),
     path(
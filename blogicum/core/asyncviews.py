@@ -0,0 +1,48 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+_executor = None
+
+
+def get_executor():
+    """Bounded pool for the ORM and template work of async views."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.ASYNC_VIEW_THREADS,
+            thread_name_prefix='async-view',
+        )
+    return _executor
+
+
+def as_async_view(view_class, **initkwargs):
+    """Wrap a class-based view into a coroutine view for ASGI servers.
+
+    Queries and rendering run in the bounded pool, so the event loop keeps
+    serving slow clients while at most ASYNC_VIEW_THREADS requests touch
+    the database at once.
+    """
+    view = view_class.as_view(**initkwargs)
+
+    def render(request, *args, **kwargs):
+        close_old_connections()
+        try:
+            response = view(request, *args, **kwargs)
+            if callable(getattr(response, 'render', None)):
+                response.render()
+            return response
+        finally:
+            close_old_connections()
+
+    async def async_view(request, *args, **kwargs):
+        run = sync_to_async(
+            render, thread_sensitive=False, executor=get_executor()
+        )
+        return await run(request, *args, **kwargs)
+
+    async_view.view_class = view_class
+    async_view.view_initkwargs = initkwargs
+    return async_view
@@ -0,0 +1,24 @@
+"""Latency columns shared by the benchmark management commands."""
+
+COLUMN_WIDTH = 10
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of the values."""
+    ordered = sorted(values)
+    index = round(percent / 100 * (len(ordered) - 1))
+    return ordered[index]
+
+
+def latency_header(percents=(50, 95)):
+    return ''.join(
+        f'{f"p{percent} ms":>{COLUMN_WIDTH}}' for percent in percents
+    )
+
+
+def latency_columns(timings, percents=(50, 95), decimals=2):
+    """Percentiles of timings in seconds, as right-aligned milliseconds."""
+    return ''.join(
+        f'{percentile(timings, percent) * 1000:>{COLUMN_WIDTH}.{decimals}f}'
+        for percent in percents
+    )
@@ -0,0 +1,152 @@
+from django.conf import settings
+from django.core import checks
+from django.core.exceptions import ImproperlyConfigured
+
+SLOW_CACHE_BACKENDS = (
+    'django.core.cache.backends.dummy.DummyCache',
+)
+SLOW_EMAIL_BACKENDS = (
+    'django.core.mail.backends.filebased.EmailBackend',
+    'django.core.mail.backends.console.EmailBackend',
+)
+QUEUED_EMAIL_BACKEND = 'core.mail.QueuedEmailBackend'
+DB_SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+CACHE_SESSION_ENGINES = (
+    'django.contrib.sessions.backends.cache',
+    'django.contrib.sessions.backends.cached_db',
+)
+PROCESS_LOCAL_CACHE = 'django.core.cache.backends.locmem.LocMemCache'
+
+
+def production_check(check):
+    """Register a check that only runs under the production profile."""
+    def wrapper(app_configs, **kwargs):
+        if not settings.PRODUCTION:
+            return []
+        return check()
+    return checks.register('production')(wrapper)
+
+
+@production_check
+def check_debug():
+    if not settings.DEBUG:
+        return []
+    return [checks.Error(
+        'DEBUG is enabled under the production profile.',
+        hint='DEBUG records every SQL query in connection.queries; '
+             'unset DJANGO_DEBUG.',
+        id='core.E001',
+    )]
+
+
+@production_check
+def check_secret_key():
+    # An unset DJANGO_SECRET_KEY falls back to the development key.
+    if settings.SECRET_KEY != settings.DEVELOPMENT_SECRET_KEY:
+        return []
+    return [checks.Error(
+        'SECRET_KEY is the development key committed to the repository.',
+        hint='Set DJANGO_SECRET_KEY to a long random value.',
+        id='core.E007',
+    )]
+
+
+@production_check
+def check_templates():
+    if settings.TEMPLATES_CACHED:
+        return []
+    return [checks.Error(
+        'Templates are re-parsed on every request.',
+        hint='Enable BLOGICUM_TEMPLATES_CACHED.',
+        id='core.E002',
+    )]
+
+
+@production_check
+def check_databases():
+    return [
+        checks.Error(
+            f'Database "{alias}" opens a new connection per request.',
+            hint='Set DB_CONN_MAX_AGE to a positive number of seconds.',
+            id='core.E003',
+        )
+        for alias, database in settings.DATABASES.items()
+        if not database.get('CONN_MAX_AGE')
+    ]
+
+
+@production_check
+def check_caches():
+    errors = []
+    for alias, cache in settings.CACHES.items():
+        if cache['BACKEND'] in SLOW_CACHE_BACKENDS:
+            errors.append(checks.Error(
+                f'Cache "{alias}" uses {cache["BACKEND"]}.',
+                hint='Configure CACHE_BACKEND with a real cache.',
+                id='core.E004',
+            ))
+        elif cache['BACKEND'] == PROCESS_LOCAL_CACHE:
+            errors.append(checks.Error(
+                f'Cache "{alias}" lives in the memory of each worker.',
+                hint='Feed generations and page counts are not shared '
+                     'between workers; point CACHE_BACKEND at a shared '
+                     'cache.',
+                id='core.E008',
+            ))
+    return errors
+
+
+@production_check
+def check_email():
+    if settings.EMAIL_BACKEND != QUEUED_EMAIL_BACKEND:
+        if settings.EMAIL_BACKEND in SLOW_EMAIL_BACKENDS:
+            return [checks.Error(
+                f'EMAIL_BACKEND is set to {settings.EMAIL_BACKEND}.',
+                hint='Configure EMAIL_BACKEND for production delivery.',
+                id='core.E005',
+            )]
+        return [checks.Warning(
+            'Emails are sent on the request path.',
+            hint=f'Set EMAIL_BACKEND to {QUEUED_EMAIL_BACKEND} and run '
+                 "'manage.py run_tasks'.",
+            id='core.W003',
+        )]
+    if settings.TASKS_EMAIL_BACKEND in SLOW_EMAIL_BACKENDS:
+        return [checks.Error(
+            f'TASKS_EMAIL_BACKEND is set to {settings.TASKS_EMAIL_BACKEND}.',
+            hint='Configure TASKS_EMAIL_BACKEND for production delivery.',
+            id='core.E006',
+        )]
+    return []
+
+
+@production_check
+def check_sessions():
+    if settings.SESSION_ENGINE == DB_SESSION_ENGINE:
+        return [checks.Warning(
+            'Sessions are read from the database on every request.',
+            hint='Use a cache-backed SESSION_ENGINE.',
+            id='core.W001',
+        )]
+    session_cache = settings.CACHES.get(settings.SESSION_CACHE_ALIAS, {})
+    if (settings.SESSION_ENGINE in CACHE_SESSION_ENGINES
+            and session_cache.get('BACKEND') == PROCESS_LOCAL_CACHE):
+        return [checks.Warning(
+            'Sessions are cached in process-local memory.',
+            hint='Workers do not share LocMemCache; point CACHE_BACKEND '
+                 'at a shared cache.',
+            id='core.W002',
+        )]
+    return []
+
+
+def run_startup_checks():
+    errors = [
+        message for message in checks.run_checks(tags=['production'])
+        if message.is_serious()
+    ]
+    if errors:
+        raise ImproperlyConfigured(
+            'Refusing to start with slow development settings:\n'
+            + '\n'.join(str(error) for error in errors)
+        )
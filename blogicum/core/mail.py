@@ -0,0 +1,81 @@
+import base64
+from email.mime.base import MIMEBase
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+
+from .tasks import task
+
+
+def encode_attachment(attachment):
+    if isinstance(attachment, MIMEBase):
+        raise ValueError('MIME attachments cannot be queued.')
+    filename, content, mimetype = attachment
+    if isinstance(content, str):
+        return [filename, content, mimetype, False]
+    return [filename, base64.b64encode(content).decode(), mimetype, True]
+
+
+def decode_attachment(filename, content, mimetype, is_binary):
+    if is_binary:
+        content = base64.b64decode(content)
+    return filename, content, mimetype
+
+
+def message_to_dict(message):
+    """JSON-serializable fields of an EmailMessage for the task queue."""
+    return {
+        'subject': message.subject,
+        'body': message.body,
+        'from_email': message.from_email,
+        'to': message.to,
+        'cc': message.cc,
+        'bcc': message.bcc,
+        'reply_to': message.reply_to,
+        'headers': message.extra_headers,
+        'alternatives': getattr(message, 'alternatives', []),
+        'attachments': [
+            encode_attachment(attachment)
+            for attachment in message.attachments
+        ],
+        'content_subtype': message.content_subtype,
+    }
+
+
+def message_from_dict(data):
+    message = EmailMultiAlternatives(
+        subject=data['subject'],
+        body=data['body'],
+        from_email=data['from_email'],
+        to=data['to'],
+        cc=data['cc'],
+        bcc=data['bcc'],
+        reply_to=data['reply_to'],
+        headers=data['headers'],
+        alternatives=[tuple(item) for item in data['alternatives']],
+        attachments=[
+            decode_attachment(*attachment)
+            for attachment in data['attachments']
+        ],
+    )
+    message.content_subtype = data['content_subtype']
+    return message
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Hand messages to the task queue instead of sending them inline.
+
+    The run_tasks worker delivers them through TASKS_EMAIL_BACKEND.
+    """
+
+    def send_messages(self, email_messages):
+        for message in email_messages:
+            send_email.delay(message_to_dict(message))
+        return len(email_messages)
+
+
+@task
+def send_email(data):
+    with get_connection(settings.TASKS_EMAIL_BACKEND) as connection:
+        connection.send_messages([message_from_dict(data)])
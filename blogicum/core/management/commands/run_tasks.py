@@ -0,0 +1,59 @@
+import multiprocessing
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.tasks import (
+    get_dead_letter_queue,
+    get_task_queue,
+    run_worker,
+)
+
+
+def worker_process(batch_size):
+    # Forked children must not share the parent's database connections.
+    connections.close_all()
+    get_task_queue.cache_clear()
+    get_dead_letter_queue.cache_clear()
+    run_worker(batch_size)
+
+
+class Command(BaseCommand):
+    help = 'Run queued background tasks (emails and other slow work).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=1)
+        parser.add_argument('--batch-size', type=int, default=10)
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Run what is due now in this process and exit.',
+        )
+        parser.add_argument(
+            '--stats', action='store_true',
+            help='Print the queue and dead-letter queue depths.',
+        )
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            stats = get_task_queue().stats()
+            dead = get_dead_letter_queue().stats()
+            self.stdout.write(
+                f'depth={stats["depth"]} '
+                f'oldest_age={stats["oldest_age"]:.2f}s '
+                f'dead={dead["depth"]}'
+            )
+            return
+        if options['once'] or options['processes'] == 1:
+            run_worker(options['batch_size'], once=options['once'])
+            return
+        connections.close_all()
+        workers = [
+            multiprocessing.Process(
+                target=worker_process, args=(options['batch_size'],)
+            )
+            for _ in range(options['processes'])
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
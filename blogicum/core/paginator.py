@@ -0,0 +1,134 @@
+from django.core.cache import cache
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+ESTIMATE_THRESHOLD = 10000
+
+
+def estimate_count(queryset):
+    """Row estimate from the query planner, None if the backend has none."""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that stops counting exactly past a threshold.
+
+    Up to `threshold` rows the count is exact and bounded by a LIMIT; above
+    it the planner estimate is used where the database provides one.
+    """
+
+    threshold = ESTIMATE_THRESHOLD
+
+    @cached_property
+    def count(self):
+        if not hasattr(self.object_list, 'query'):
+            return super().count
+        capped = self.object_list[:self.threshold + 1].count()
+        if capped <= self.threshold:
+            return capped
+        estimate = estimate_count(self.object_list)
+        if estimate is None:
+            return super().count
+        return max(estimate, capped)
+
+
+class WindowPage(Page):
+    on_each_side = 2
+    on_ends = 1
+
+    @property
+    def page_window(self):
+        """Page numbers around the current one, with ELLIPSIS for gaps."""
+        return list(self.paginator.get_elided_page_range(
+            self.number, on_each_side=self.on_each_side, on_ends=self.on_ends
+        ))
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator that keeps the total in the cache under a caller's key.
+
+    The key must change whenever the counted rows may have changed; without
+    a key it counts every time, like the stock paginator.
+    """
+
+    counts_pages = True
+
+    def __init__(self, *args, count_cache_key=None, count_timeout=None,
+                 **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_cache_key = count_cache_key
+        self.count_timeout = count_timeout
+
+    @cached_property
+    def count(self):
+        if self.count_cache_key is None:
+            return super().count
+        return cache.get_or_set(
+            self.count_cache_key,
+            lambda: super(CachedCountPaginator, self).count,
+            self.count_timeout
+        )
+
+    def _get_page(self, *args, **kwargs):
+        return WindowPage(*args, **kwargs)
+
+
+class HasNextPage(Page):
+    page_window = ()
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+    def start_index(self):
+        if not self.object_list:
+            return 0
+        return self.paginator.per_page * (self.number - 1) + 1
+
+    def end_index(self):
+        return self.paginator.per_page * (self.number - 1) + len(
+            self.object_list
+        )
+
+
+class HasNextPaginator(Paginator):
+    """Count-free pagination: one extra row tells if a next page exists.
+
+    Pages know their neighbours but not the total, so templates show
+    previous/next links only.
+    """
+
+    counts_pages = False
+
+    def validate_number(self, number):
+        try:
+            if isinstance(number, float) and not number.is_integer():
+                raise ValueError
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger('That page number is not an integer')
+        if number < 1:
+            raise EmptyPage('That page number is less than 1')
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        rows = list(self.object_list[bottom:bottom + self.per_page + 1])
+        if not rows and (number > 1 or not self.allow_empty_first_page):
+            raise EmptyPage('That page contains no results')
+        return HasNextPage(
+            rows[:self.per_page], number, self,
+            has_next=len(rows) > self.per_page
+        )
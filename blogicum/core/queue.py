@@ -0,0 +1,105 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import NamedTuple
+
+from django.conf import settings
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS spool (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    queue TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS spool_ready ON spool (queue, available_at, id);
+"""
+
+
+class Message(NamedTuple):
+    id: int
+    payload: dict
+    attempts: int
+    created_at: float
+
+
+class SpoolQueue:
+    """Durable FIFO queue kept in a local SQLite file.
+
+    Messages survive restarts; a claimed message is leased for a while and
+    comes back if the worker dies before acknowledging it. Several queues
+    share one spool file, separated by name.
+    """
+
+    def __init__(self, name, path=None):
+        self.name = name
+        self.path = str(path or settings.SPOOL_PATH)
+        self._local = threading.local()
+
+    @property
+    def connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=30, isolation_level=None
+            )
+            connection.execute('PRAGMA journal_mode=WAL')
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    def put(self, payload, delay=0):
+        now = time.time()
+        self.connection.execute(
+            'INSERT INTO spool (queue, payload, available_at, created_at) '
+            'VALUES (?, ?, ?, ?)',
+            (self.name, json.dumps(payload), now + delay, now),
+        )
+
+    def claim(self, limit, lease=60):
+        now = time.time()
+        connection = self.connection
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            rows = connection.execute(
+                'SELECT id, payload, attempts, created_at FROM spool '
+                'WHERE queue = ? AND available_at <= ? ORDER BY id LIMIT ?',
+                (self.name, now, limit),
+            ).fetchall()
+            connection.executemany(
+                'UPDATE spool SET available_at = ?, attempts = attempts + 1 '
+                'WHERE id = ?',
+                [(now + lease, row[0]) for row in rows],
+            )
+            connection.execute('COMMIT')
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        return [
+            Message(pk, json.loads(payload), attempts + 1, created_at)
+            for pk, payload, attempts, created_at in rows
+        ]
+
+    def ack(self, ids):
+        self.connection.executemany(
+            'DELETE FROM spool WHERE id = ?', [(pk,) for pk in ids]
+        )
+
+    def retry(self, message_id, delay):
+        self.connection.execute(
+            'UPDATE spool SET available_at = ? WHERE id = ?',
+            (time.time() + delay, message_id),
+        )
+
+    def stats(self):
+        depth, oldest = self.connection.execute(
+            'SELECT COUNT(*), MIN(created_at) FROM spool WHERE queue = ?',
+            (self.name,),
+        ).fetchone()
+        return {
+            'depth': depth,
+            'oldest_age': time.time() - oldest if oldest else 0.0,
+        }
@@ -0,0 +1,11 @@
+from django.conf import settings
+
+from .checks import run_startup_checks
+from .templates import warmup_templates
+
+
+def on_worker_start():
+    if settings.PRODUCTION:
+        run_startup_checks()
+    if settings.TEMPLATES_WARMUP:
+        warmup_templates()
@@ -0,0 +1,94 @@
+"""Background tasks on the local spool queue.
+
+Decorate a function with @task and call func.delay(*args, **kwargs) to run
+it in a 'manage.py run_tasks' worker instead of the request. Arguments
+must be JSON-serializable. A failing task is retried with exponential
+backoff and moved to the dead-letter queue after TASK_MAX_ATTEMPTS.
+"""
+import logging
+import time
+from functools import lru_cache
+from importlib import import_module
+
+from django.conf import settings
+
+from .queue import SpoolQueue
+
+logger = logging.getLogger(__name__)
+
+REGISTRY = {}
+
+
+def task(func):
+    name = f'{func.__module__}.{func.__name__}'
+    REGISTRY[name] = func
+    func.task_name = name
+    func.delay = lambda *args, **kwargs: enqueue(name, *args, **kwargs)
+    return func
+
+
+@lru_cache(maxsize=None)
+def get_task_queue():
+    return SpoolQueue('tasks')
+
+
+@lru_cache(maxsize=None)
+def get_dead_letter_queue():
+    return SpoolQueue('tasks.dead')
+
+
+def enqueue(name, *args, **kwargs):
+    get_task_queue().put({'task': name, 'args': args, 'kwargs': kwargs})
+
+
+def get_task(name):
+    if name not in REGISTRY:
+        # Tasks register on import; the worker may not have imported yet.
+        import_module(name.rsplit('.', 1)[0])
+    return REGISTRY[name]
+
+
+def retry_delay(attempts):
+    return min(
+        settings.TASK_RETRY_DELAY * 2 ** (attempts - 1),
+        settings.TASK_RETRY_MAX_DELAY,
+    )
+
+
+def run_message(queue, message):
+    payload = message.payload
+    try:
+        get_task(payload['task'])(*payload['args'], **payload['kwargs'])
+    except Exception as error:
+        if message.attempts < settings.TASK_MAX_ATTEMPTS:
+            delay = retry_delay(message.attempts)
+            logger.warning(
+                'Task %s failed (attempt %d), retrying in %ds',
+                payload['task'], message.attempts, delay, exc_info=True,
+            )
+            queue.retry(message.id, delay)
+            return False
+        logger.error(
+            'Task %s failed %d times, moved to the dead-letter queue',
+            payload['task'], message.attempts, exc_info=True,
+        )
+        get_dead_letter_queue().put({**payload, 'error': repr(error)})
+    queue.ack([message.id])
+    return True
+
+
+def run_batch(batch_size, lease=None):
+    """Run up to batch_size due tasks; returns how many were claimed."""
+    queue = get_task_queue()
+    messages = queue.claim(batch_size, lease or settings.TASK_LEASE)
+    for message in messages:
+        run_message(queue, message)
+    return len(messages)
+
+
+def run_worker(batch_size, once=False):
+    while True:
+        if not run_batch(batch_size):
+            if once:
+                return
+            time.sleep(settings.TASK_POLL_INTERVAL)
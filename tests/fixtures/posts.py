@@ -140,3 +140,41 @@ def create_post_context_form_item(
         ),
     )
     return result
+
+
+@pytest.fixture
+def visible_post(mixer: Mixer, user, published_category, published_location):
+    return mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        location=published_location,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+
+
+@pytest.fixture
+def visible_posts(
+    mixer: Mixer, user, published_category, published_location
+):
+    now = timezone.now()
+    return mixer.cycle(6).blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        location=published_location,
+        is_published=True,
+        pub_date=(now - timedelta(hours=hours) for hours in range(1, 7)),
+    )
+
+
+@pytest.fixture
+def hidden_post(mixer: Mixer, user, published_category):
+    return mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        is_published=False,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
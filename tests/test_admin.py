@@ -0,0 +1,181 @@
+import pytest
+from django.contrib.admin import helpers
+from django.contrib.auth.models import Permission
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+CHANGELIST_URL = "/admin/blog/post/"
+
+
+def run_action(admin_client, action, posts, **data):
+    return admin_client.post(CHANGELIST_URL, {
+        "action": action,
+        "index": 0,
+        helpers.ACTION_CHECKBOX_NAME: [post.id for post in posts],
+        **data,
+    })
+
+
+def test_unpublish_is_one_update(admin_client, visible_posts):
+    with CaptureQueriesContext(connection) as queries:
+        response = run_action(
+            admin_client, "unpublish_posts", visible_posts[:4]
+        )
+    assert response.status_code == 302
+    updates = [
+        query["sql"] for query in queries
+        if query["sql"].startswith('UPDATE "blog_post"')
+    ]
+    assert len(updates) == 1, (
+        "Убедитесь, что снятие с публикации выполняется одним UPDATE."
+    )
+    assert Post.objects.filter(is_published=False).count() == 4
+    run_action(admin_client, "publish_posts", visible_posts[:2])
+    assert Post.objects.filter(is_published=False).count() == 2
+
+
+@pytest.mark.parametrize("action, field, value", [
+    ("publish_posts", "is_published", True),
+    ("unpublish_posts", "is_published", False),
+    ("move_to_category", "category_id", None),
+])
+def test_view_only_staff_cannot_run_actions(
+    client, django_user_model, mixer, visible_posts, action, field, value
+):
+    staff = django_user_model.objects.create_user(
+        username="viewer", password="pass", is_staff=True
+    )
+    staff.user_permissions.add(Permission.objects.get(codename="view_post"))
+    client.force_login(staff)
+    category = mixer.blend("blog.Category", is_published=True)
+    if value is None:
+        value = category.id
+    Post.objects.filter(id=visible_posts[0].id).update(is_published=not value)
+    run_action(
+        client, action, visible_posts[:1], apply="1", category=category.id
+    )
+    assert getattr(Post.objects.get(id=visible_posts[0].id), field) != value, (
+        "Убедитесь, что действия над публикациями недоступны"
+        " пользователю с правом только на просмотр."
+    )
+
+
+def test_move_to_category(admin_client, mixer, visible_posts):
+    category = mixer.blend("blog.Category", is_published=True)
+    response = run_action(admin_client, "move_to_category", visible_posts[:3])
+    assert response.status_code == 200, (
+        "Убедитесь, что перед переносом показывается форма выбора категории."
+    )
+    assert Post.objects.filter(category=category).count() == 0
+    response = run_action(
+        admin_client, "move_to_category", visible_posts[:3],
+        apply=1, category=category.id,
+    )
+    assert response.status_code == 302
+    assert Post.objects.filter(category=category).count() == 3
+
+
+def test_delete_with_comments(admin_client, mixer, visible_posts, monkeypatch):
+    mixer.cycle(3).blend("blog.Comment", post=visible_posts[0])
+    mixer.cycle(2).blend("blog.Comment", post=visible_posts[5])
+    monkeypatch.setattr("blog.admin.DELETE_CHUNK_SIZE", 2)
+    response = run_action(
+        admin_client, "delete_with_comments", visible_posts[:5]
+    )
+    assert response.status_code == 302
+    assert list(Post.objects.all()) == [visible_posts[5]]
+    assert Comment.objects.count() == 2
+    visible_posts[5].category.refresh_from_db()
+    assert visible_posts[5].category.post_count == 1, (
+        "Убедитесь, что после удаления счётчики категорий пересчитываются."
+    )
+
+
+def test_raw_delete_covers_every_relation():
+    # delete_posts_with_comments() deletes without cascades or signals,
+    # which is only correct for exactly these relations.
+    assert {
+        relation.related_model for relation in Post._meta.related_objects
+    } == {Comment}, (
+        "На публикации ссылается новая модель: удаление из админки"
+        " должно удалять и её строки."
+    )
+    assert not Comment._meta.related_objects
+
+
+def test_changelist_joins_related(admin_client, visible_posts):
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.get(CHANGELIST_URL)
+    assert response.status_code == 200
+    related = [
+        query["sql"] for query in queries
+        if query["sql"].startswith(
+            ('SELECT "blog_location"', 'SELECT "blog_category"')
+        ) and "WHERE" in query["sql"]
+    ]
+    assert not related, (
+        "Убедитесь, что список публикаций в админке не загружает"
+        " местоположения и категории отдельными запросами для каждой строки."
+    )
+
+
+def test_changelist_older_link(admin_client, visible_posts, monkeypatch):
+    monkeypatch.setattr(
+        "blog.admin.PostAdmin.list_per_page", 4, raising=False
+    )
+    response = admin_client.get(CHANGELIST_URL)
+    older = response.context["cl"].older_query_string
+    assert older and "older=" in older
+    response = admin_client.get(CHANGELIST_URL + older)
+    assert response.status_code == 200
+    assert len(response.context["cl"].result_list) == 2
+
+
+def test_changelist_older_link_breaks_pub_date_ties(
+    admin_client, visible_posts, monkeypatch
+):
+    Post.objects.update(pub_date=visible_posts[0].pub_date)
+    monkeypatch.setattr(
+        "blog.admin.PostAdmin.list_per_page", 4, raising=False
+    )
+    response = admin_client.get(CHANGELIST_URL)
+    first = list(response.context["cl"].result_list)
+    older = response.context["cl"].older_query_string
+    response = admin_client.get(CHANGELIST_URL + older)
+    second = list(response.context["cl"].result_list)
+    assert len(second) == 2 and not set(first) & set(second), (
+        "Убедитесь, что ссылка на более старые записи не теряет и не"
+        " повторяет посты с одинаковой датой публикации."
+    )
+
+
+def test_changelist_filters_list_limited_choices(
+    admin_client, mixer, visible_posts, monkeypatch
+):
+    monkeypatch.setattr("blog.admin.LIST_FILTER_LIMIT", 2)
+    mixer.cycle(4).blend("blog.Location")
+    response = admin_client.get(
+        CHANGELIST_URL,
+        {"location__id__exact": visible_posts[0].location_id},
+    )
+    assert response.status_code == 200
+    spec, = (
+        spec for spec in response.context["cl"].filter_specs
+        if spec.field_path == "location"
+    )
+    assert len(spec.lookup_choices) <= 3
+    assert visible_posts[0].location_id in dict(spec.lookup_choices)
+
+
+def test_estimated_paginator_caps_count(visible_posts):
+    from core.paginator import EstimatedCountPaginator
+
+    paginator = EstimatedCountPaginator(Post.objects.order_by("id"), 2)
+    paginator.threshold = 3
+    with CaptureQueriesContext(connection) as queries:
+        assert paginator.count == 6
+    assert "LIMIT 4" in queries[0]["sql"]
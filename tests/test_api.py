@@ -0,0 +1,170 @@
+import base64
+import json
+from http import HTTPStatus
+from urllib.parse import urlencode
+
+import pytest
+from django.test.client import (
+    BOUNDARY,
+    MULTIPART_CONTENT,
+    Client,
+    encode_multipart,
+)
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_list_cursor_pagination(client, visible_posts, hidden_post):
+    response = client.get("/api/posts/", {"limit": 2})
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    ids = [post["id"] for post in data["results"]]
+    while data["next"]:
+        data = client.get(data["next"]).json()
+        ids.extend(post["id"] for post in data["results"])
+    expected = [post.id for post in visible_posts]
+    assert ids == expected, (
+        "Убедитесь, что API отдаёт все опубликованные посты от новых к"
+        " старым и не отдаёт скрытые."
+    )
+
+
+def test_post_list_sparse_fields(client, visible_posts):
+    response = client.get("/api/posts/", {"fields": "id,title"})
+    assert set(response.json()["results"][0]) == {"id", "title"}
+    response = client.get("/api/posts/", {"fields": "id, title, "})
+    assert set(response.json()["results"][0]) == {"id", "title"}
+    response = client.get("/api/posts/", {"fields": "id,password"})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+@pytest.mark.parametrize(
+    "position", ["2024-13-45 25:00:00+00:00", "abc", ""]
+)
+def test_invalid_cursor_is_bad_request(client, visible_posts, position):
+    cursor = base64.urlsafe_b64encode(f"{position}|5".encode()).decode()
+    for url in ("/api/posts/", f"/api/posts/{visible_posts[0].id}/comments/"):
+        response = client.get(url, {"cursor": cursor})
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            "Убедитесь, что API отвечает 400 на курсор с неверной позицией."
+        )
+
+
+def test_post_detail_visibility(
+        client, user_client, another_user_client, hidden_post):
+    url = f"/api/posts/{hidden_post.id}/"
+    assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+    assert another_user_client.get(url).status_code == HTTPStatus.NOT_FOUND
+    assert user_client.get(url).status_code == HTTPStatus.OK
+
+
+def test_post_write_requires_owner(
+        client, user_client, another_user_client, visible_posts):
+    post = visible_posts[0]
+    url = f"/api/posts/{post.id}/"
+    payload = json.dumps({"title": "Новый заголовок"})
+    response = client.patch(url, payload, content_type="application/json")
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    response = another_user_client.patch(
+        url, payload, content_type="application/json"
+    )
+    assert response.status_code == HTTPStatus.FORBIDDEN
+    response = user_client.patch(
+        url, payload, content_type="application/json"
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()["title"] == "Новый заголовок"
+    response = user_client.patch(
+        url, urlencode({"title": "Из формы"}),
+        content_type="application/x-www-form-urlencoded",
+    )
+    assert response.json()["title"] == "Из формы", (
+        "Убедитесь, что PATCH принимает тело в формате формы."
+    )
+    response = user_client.patch(
+        url, encode_multipart(BOUNDARY, {"title": "Из multipart"}),
+        content_type=MULTIPART_CONTENT,
+    )
+    assert response.json()["title"] == "Из multipart"
+    assert another_user_client.delete(url).status_code == (
+        HTTPStatus.FORBIDDEN
+    )
+    assert user_client.delete(url).status_code == HTTPStatus.NO_CONTENT
+
+
+def test_writes_need_csrf_token(user, visible_posts):
+    client = Client(enforce_csrf_checks=True)
+    client.force_login(user)
+    url = f"/api/posts/{visible_posts[0].id}/"
+    payload = json.dumps({"title": "Новый заголовок"})
+    response = client.patch(url, payload, content_type="application/json")
+    assert response.status_code == HTTPStatus.FORBIDDEN
+    assert "error" in response.json(), (
+        "Убедитесь, что ошибка CSRF в API возвращается в формате JSON."
+    )
+    response = client.get("/api/csrf/")
+    token = response.json()["csrftoken"]
+    assert "csrftoken" in response.cookies
+    response = client.patch(
+        url, payload, content_type="application/json",
+        HTTP_X_CSRFTOKEN=token,
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()["title"] == "Новый заголовок"
+
+
+def test_profile_links_encoded_author(client, mixer):
+    mixer.blend("auth.User", username="a+b@example")
+    response = client.get("/api/profiles/a+b@example/")
+    assert response.json()["posts"].endswith(
+        "?" + urlencode({"author": "a+b@example"})
+    )
+
+
+def test_comment_create_and_list(user_client, visible_posts):
+    post = visible_posts[0]
+    url = f"/api/posts/{post.id}/comments/"
+    response = user_client.post(
+        url, json.dumps({"text": "Комментарий"}),
+        content_type="application/json",
+    )
+    assert response.status_code == HTTPStatus.CREATED
+    comments = user_client.get(url).json()["results"]
+    assert [comment["text"] for comment in comments] == ["Комментарий"]
+
+
+def test_post_batch(client, mixer, visible_posts, hidden_post):
+    mixer.cycle(3).blend("blog.Comment", post=visible_posts[1])
+    ids = [visible_posts[1].id, hidden_post.id, visible_posts[0].id]
+    response = client.get(
+        "/api/posts/batch/",
+        {"ids": ",".join(map(str, ids)), "fields": "id,comment_count"},
+    )
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert data["results"] == [
+        {"id": visible_posts[1].id, "comment_count": 3},
+        {"id": visible_posts[0].id, "comment_count": 0},
+    ], (
+        "Убедитесь, что пакетный запрос возвращает видимые посты в"
+        " запрошенном порядке вместе с числом комментариев."
+    )
+    assert data["missing"] == [hidden_post.id]
+
+
+def test_post_batch_query_count(
+        client, visible_posts, django_assert_num_queries):
+    ids = ",".join(str(post.id) for post in visible_posts)
+    with django_assert_num_queries(2):
+        client.get("/api/posts/batch/", {"ids": ids})
+
+
+def test_lookup_prefix(client, mixer):
+    for name in ("Москва", "Мурманск", "Минск", "Казань"):
+        mixer.blend("blog.Location", name=name, is_published=True)
+    mixer.blend("blog.Location", name="Мытищи", is_published=False)
+    response = client.get("/api/lookup/locations/", {"q": "М"})
+    assert response.status_code == HTTPStatus.OK
+    assert [item["text"] for item in response.json()["results"]] == [
+        "Минск", "Москва", "Мурманск"
+    ]
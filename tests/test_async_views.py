@@ -0,0 +1,35 @@
+import asyncio
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory
+
+from blog.views import IndexView, PostDetailView
+from core.asyncviews import as_async_view
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+def get_response(view_class, path, **kwargs):
+    view = as_async_view(view_class)
+    assert asyncio.iscoroutinefunction(view), (
+        "Убедитесь, что `as_async_view` возвращает асинхронное представление."
+    )
+    request = RequestFactory().get(path)
+    request.user = AnonymousUser()
+    return async_to_sync(view)(request, **kwargs)
+
+
+def test_async_index_view(visible_post):
+    response = get_response(IndexView, "/")
+    assert response.status_code == 200
+    assert visible_post.title in response.content.decode()
+
+
+def test_async_detail_view(visible_post):
+    response = get_response(
+        PostDetailView, f"/posts/{visible_post.id}/", id=visible_post.id
+    )
+    assert response.status_code == 200
+    assert visible_post.title in response.content.decode()
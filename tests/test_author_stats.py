@@ -0,0 +1,99 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.counters import rebuild_author_stats
+from blog.ingest import get_comment_queue, ingest_batch
+from blog.models import AuthorStats, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def stats_of(user):
+    stats = AuthorStats.objects.get(user=user)
+    return stats.post_count, stats.comment_count
+
+
+@pytest.fixture
+def posts(mixer, user, published_category):
+    return mixer.cycle(3).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+
+
+def test_stats_follow_posts_and_comments(mixer, user, another_user, posts):
+    assert stats_of(user) == (3, 0)
+    comments = mixer.cycle(2).blend(
+        "blog.Comment", post=posts[0], author=another_user
+    )
+    assert stats_of(another_user) == (0, 2)
+    assert AuthorStats.objects.get(
+        user=another_user
+    ).last_activity == comments[1].created_at
+    posts[1].is_published = False
+    posts[1].save()
+    assert stats_of(user) == (2, 0)
+    posts[0].delete()
+    assert stats_of(user) == (1, 0)
+    assert stats_of(another_user) == (0, 0)
+
+
+def test_loaded_post_saves_without_reading_it_again(posts):
+    post = Post.objects.get(id=posts[0].id)
+    post.is_published = False
+    with CaptureQueriesContext(connection) as queries:
+        post.save()
+    assert not [
+        query for query in queries
+        if query["sql"].startswith('SELECT "blog_post"')
+    ], "Убедитесь, что сохранение загруженного поста не читает его заново."
+    assert stats_of(post.author) == (2, 0)
+
+
+def test_ingested_comments_are_counted(tmp_path, user, posts):
+    get_comment_queue.cache_clear()
+    with override_settings(SPOOL_PATH=tmp_path / "spool.sqlite3"):
+        queue = get_comment_queue()
+        for number in range(4):
+            queue.put({
+                "post_id": posts[0].id,
+                "author_id": user.id,
+                "text": f"Комментарий {number}",
+            })
+        ingest_batch(10)
+    get_comment_queue.cache_clear()
+    assert stats_of(user) == (3, 4)
+
+
+def test_rebuild_matches_incremental(mixer, user, another_user, posts):
+    mixer.cycle(2).blend("blog.Comment", post=posts[0], author=user)
+    expected = {
+        stats.user_id: (stats.post_count, stats.comment_count,
+                        stats.last_activity)
+        for stats in AuthorStats.objects.all()
+    }
+    AuthorStats.objects.all().delete()
+    rebuild_author_stats()
+    rebuilt = {
+        stats.user_id: (stats.post_count, stats.comment_count,
+                        stats.last_activity)
+        for stats in AuthorStats.objects.all()
+    }
+    assert rebuilt[user.id] == expected[user.id]
+    assert rebuilt[another_user.id] == (0, 0, None)
+
+
+def test_profile_shows_stats(client, user, posts, django_assert_num_queries):
+    with django_assert_num_queries(3):
+        response = client.get(f"/profile/{user.username}/")
+    assert "Публикаций: 3" in response.content.decode(), (
+        "Убедитесь, что на странице профиля выводится число публикаций."
+    )
@@ -0,0 +1,91 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.admin import helpers
+from django.utils import timezone
+
+from blog.counters import recount_categories
+from blog.models import Category
+
+pytestmark = [pytest.mark.django_db]
+
+
+def counters(category):
+    category.refresh_from_db()
+    return category.post_count, category.last_post_at
+
+
+@pytest.fixture
+def other_category(mixer):
+    return mixer.blend("blog.Category", is_published=True)
+
+
+def test_counters_follow_post_changes(
+        mixer, user, published_category, other_category):
+    now = timezone.now()
+    older, newer = mixer.cycle(2).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=(now - timedelta(days=days) for days in (2, 1)),
+    )
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=now + timedelta(days=1),
+    )
+    assert counters(published_category) == (2, newer.pub_date), (
+        "Убедитесь, что счётчик категории учитывает только видимые посты."
+    )
+    newer.is_published = False
+    newer.save()
+    assert counters(published_category) == (1, older.pub_date)
+    older.category = other_category
+    older.save()
+    assert counters(published_category) == (0, None)
+    assert counters(other_category) == (1, older.pub_date)
+    older.delete()
+    assert counters(other_category) == (0, None)
+
+
+def test_recount_matches_incremental(
+        mixer, user, published_category, other_category):
+    mixer.cycle(4).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1),
+    )
+    expected = counters(published_category)
+    Category.objects.update(post_count=0, last_post_at=None)
+    recount_categories()
+    assert counters(published_category) == expected
+    assert counters(other_category) == (0, None)
+
+
+def test_category_directory(
+        client, mixer, user, published_category, django_assert_num_queries):
+    mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1),
+    )
+    mixer.blend("blog.Category", is_published=False, title="Скрытая")
+    with django_assert_num_queries(2):
+        response = client.get("/category/")
+    assert response.status_code == 200
+    content = response.content.decode()
+    assert published_category.title in content
+    assert "Скрытая" not in content
+    assert response.context["page_obj"][0].post_count == 3
+
+
+def test_admin_bulk_action_recounts(admin_client, mixer, user,
+                                    published_category):
+    posts = mixer.cycle(3).blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(days=1),
+    )
+    admin_client.post("/admin/blog/post/", {
+        "action": "unpublish_posts",
+        "index": 0,
+        helpers.ACTION_CHECKBOX_NAME: [post.id for post in posts[:2]],
+    })
+    assert counters(published_category)[0] == 1
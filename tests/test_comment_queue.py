@@ -0,0 +1,123 @@
+from datetime import timedelta
+from http import HTTPStatus
+from types import SimpleNamespace
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.ingest import (
+    enqueue_comment,
+    get_comment_queue,
+    get_dead_letter_queue,
+    ingest_batch,
+)
+from blog.models import Comment
+from blog.signals import comments_ingested
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def queued_mode(tmp_path):
+    get_comment_queue.cache_clear()
+    get_dead_letter_queue.cache_clear()
+    with override_settings(
+        COMMENT_INGESTION="queued", SPOOL_PATH=tmp_path / "spool.sqlite3"
+    ):
+        yield
+    get_comment_queue.cache_clear()
+    get_dead_letter_queue.cache_clear()
+
+
+def test_queued_comment_is_inserted_by_worker(
+        queued_mode, user_client, visible_post):
+    url = f"/posts/{visible_post.id}/comment/"
+    for number in range(3):
+        response = user_client.post(url, {"text": f"Комментарий {number}"})
+        assert response.status_code == HTTPStatus.FOUND
+    assert not visible_post.comments.exists(), (
+        "Убедитесь, что в режиме очереди комментарий не записывается"
+        " в базу данных при обработке запроса."
+    )
+    assert get_comment_queue().stats()["depth"] == 3
+    assert ingest_batch(batch_size=100) == 3
+    assert sorted(visible_post.comments.values_list("text", flat=True)) == [
+        "Комментарий 0", "Комментарий 1", "Комментарий 2",
+    ]
+    assert get_comment_queue().stats()["depth"] == 0
+
+
+def test_full_queue_rejects_comments(queued_mode, user_client, visible_post):
+    url = f"/posts/{visible_post.id}/comment/"
+    with override_settings(COMMENT_QUEUE_MAX_DEPTH=1):
+        user_client.post(url, {"text": "Первый"})
+        response = user_client.post(url, {"text": "Второй"})
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.has_header("Retry-After")
+
+
+def test_ingestion_keeps_submission_time(queued_mode, user, visible_post):
+    enqueue_comment(visible_post.id, user.id, "Давний комментарий")
+    get_comment_queue().connection.execute(
+        "UPDATE spool SET created_at = created_at - 3600"
+    )
+    ingest_batch(batch_size=10)
+    comment = visible_post.comments.get()
+    assert comment.created_at < timezone.now() - timedelta(minutes=59), (
+        "Убедитесь, что комментарий из очереди сохраняет время отправки."
+    )
+
+
+@pytest.mark.parametrize("vendor", ["sqlite", "mysql"])
+def test_ingested_comments_get_their_ids(
+        queued_mode, monkeypatch, mixer, user, visible_post, vendor):
+    received = []
+
+    def receiver(sender, comments, **kwargs):
+        received.extend((comment.id, comment.text) for comment in comments)
+
+    for number in range(3):
+        enqueue_comment(visible_post.id, user.id, f"Комментарий {number}")
+    # A comment written outside the queue must keep its own id.
+    mixer.blend("blog.Comment", post=visible_post, author=user)
+    monkeypatch.setattr("blog.ingest.connection", SimpleNamespace(
+        vendor=vendor, ops=connection.ops,
+        features=connection.features, alias=connection.alias,
+    ))
+    comments_ingested.connect(receiver)
+    try:
+        ingest_batch(batch_size=10)
+    finally:
+        comments_ingested.disconnect(receiver)
+    assert received == list(
+        Comment.objects.filter(text__startswith="Комментарий ")
+        .order_by("id").values_list("id", "text")
+    ), (
+        "Убедитесь, что комментарии из очереди получают id своих строк."
+    )
+
+
+def test_comment_of_deleted_author_is_dropped(
+        queued_mode, another_user, user, visible_post):
+    enqueue_comment(visible_post.id, another_user.id, "Удалённый автор")
+    enqueue_comment(visible_post.id, user.id, "Живой автор")
+    another_user.delete()
+    assert ingest_batch(batch_size=10) == 2
+    assert list(visible_post.comments.values_list("text", flat=True)) == [
+        "Живой автор"
+    ]
+    assert get_comment_queue().stats()["depth"] == 0
+
+
+@override_settings(TASK_MAX_ATTEMPTS=1)
+def test_failing_comment_is_dead_lettered(queued_mode, user, visible_post):
+    enqueue_comment(visible_post.id, user.id, None)
+    enqueue_comment(visible_post.id, user.id, "Нормальный")
+    assert ingest_batch(batch_size=10) == 2
+    assert list(visible_post.comments.values_list("text", flat=True)) == [
+        "Нормальный"
+    ], "Убедитесь, что ошибка одного комментария не блокирует остальные."
+    assert get_comment_queue().stats()["depth"] == 0
+    assert get_dead_letter_queue().stats()["depth"] == 1
@@ -0,0 +1,108 @@
+from http import HTTPStatus
+
+import pytest
+from django.test import override_settings
+
+from blog.events import InProcessBroker, get_broker
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def fresh_broker():
+    # Comments saved by earlier tests stay buffered in the process broker.
+    get_broker.cache_clear()
+    yield
+    get_broker.cache_clear()
+
+stream_mode = override_settings(
+    COMMENT_UPDATES="stream", COMMENT_STREAM_DURATION=0
+)
+
+
+def read_stream(response):
+    return b"".join(response.streaming_content).decode()
+
+
+@stream_mode
+def test_stream_replays_missed_comments(client, mixer, visible_post):
+    comments = mixer.cycle(3).blend("blog.Comment", post=visible_post)
+    response = client.get(
+        f"/posts/{visible_post.id}/comments/stream/",
+        HTTP_LAST_EVENT_ID=str(comments[0].id),
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response["Content-Type"] == "text/event-stream"
+    content = read_stream(response)
+    assert f"id: {comments[0].id}\n" not in content
+    for comment in comments[1:]:
+        assert f"id: {comment.id}\n" in content, (
+            "Убедитесь, что поток отдаёт комментарии, пропущенные клиентом."
+        )
+    profile_url = f"/profile/{comments[1].author.username}/"
+    assert profile_url in content, (
+        "Убедитесь, что комментарий в потоке содержит ссылку на профиль"
+        " автора, как и в списке комментариев."
+    )
+
+
+def test_updates_are_off_by_default(client, visible_post):
+    url = f"/posts/{visible_post.id}/"
+    for suffix in ("comments/stream/", "comments/poll/"):
+        assert client.get(url + suffix).status_code == HTTPStatus.NOT_FOUND
+    assert "EventSource" not in client.get(url).content.decode(), (
+        "Убедитесь, что живые комментарии включаются только настройкой."
+    )
+
+
+@override_settings(COMMENT_UPDATES="poll", COMMENT_POLL_TIMEOUT=0)
+def test_poll_returns_comments_after_id(client, mixer, visible_post):
+    comments = mixer.cycle(2).blend("blog.Comment", post=visible_post)
+    response = client.get(
+        f"/posts/{visible_post.id}/comments/poll/",
+        {"after": comments[0].id},
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert [item["id"] for item in response.json()["comments"]] == [
+        comments[1].id
+    ]
+
+
+@stream_mode
+def test_stream_for_hidden_post_not_found(client, mixer, user):
+    post = mixer.blend("blog.Post", author=user, is_published=False)
+    response = client.get(f"/posts/{post.id}/comments/stream/")
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.parametrize("url, data", [
+    ("/posts/{}/comment/", {"text": "Новый комментарий"}),
+    ("/api/posts/{}/comments/", {"text": "Новый комментарий"}),
+])
+def test_new_comment_is_published(user_client, visible_post, url, data):
+    user_client.post(url.format(visible_post.id), data)
+    events = get_broker().wait(visible_post.id, 0, timeout=0)
+    assert [event["text"] for event in events] == ["Новый комментарий"], (
+        "Убедитесь, что новый комментарий публикуется в поток событий."
+    )
+
+
+def test_in_process_broker_wakes_waiters():
+    broker = InProcessBroker()
+    broker.publish(1, {"id": 5, "text": "старый"})
+    broker.publish(1, {"id": 6, "text": "новый"})
+    broker.publish(2, {"id": 7, "text": "чужой"})
+    assert broker.wait(1, 5, timeout=0) == [{"id": 6, "text": "новый"}]
+    assert broker.wait(1, 6, timeout=0) == []
+
+
+def test_in_process_broker_evicts_old_posts(monkeypatch):
+    monkeypatch.setattr("blog.events.MAX_BUFFERED_POSTS", 2)
+    broker = InProcessBroker()
+    for post_id in (1, 2, 1, 3):
+        broker.publish(post_id, {"id": post_id, "text": "комментарий"})
+    assert broker.wait(2, 0, timeout=0) == [], (
+        "Убедитесь, что брокер не хранит буферы всех постов бесконечно."
+    )
+    assert broker.wait(1, 0, timeout=0)
+    assert broker.wait(3, 0, timeout=0)
@@ -0,0 +1,109 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.mark.parametrize("url_name", ["index", "category", "detail"])
+def test_unchanged_page_answers_not_modified(
+        client, visible_post, url_name):
+    url = {
+        "index": "/",
+        "category": f"/category/{visible_post.category.slug}/",
+        "detail": f"/posts/{visible_post.id}/",
+    }[url_name]
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert response.has_header("ETag"), (
+        f"Убедитесь, что страница `{url}` отдаёт заголовок ETag."
+    )
+    repeated = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert repeated.status_code == HTTPStatus.NOT_MODIFIED, (
+        f"Убедитесь, что неизменившаяся страница `{url}` отвечает"
+        " 304 Not Modified."
+    )
+    repeated = client.get(
+        url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"]
+    )
+    assert repeated.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_new_comment_changes_etag(client, mixer, visible_post):
+    url = f"/posts/{visible_post.id}/"
+    etag = client.get(url)["ETag"]
+    mixer.blend("blog.Comment", post=visible_post)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что после добавления комментария страница поста"
+        " отдаётся заново."
+    )
+
+
+def test_etag_differs_between_users(client, user_client, visible_post):
+    url = f"/posts/{visible_post.id}/"
+    etag = client.get(url)["ETag"]
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_edited_comment_changes_etag(
+        client, user_client, mixer, user, visible_post):
+    comment = mixer.blend("blog.Comment", post=visible_post, author=user)
+    url = f"/posts/{visible_post.id}/"
+    etag = user_client.get(url)["ETag"]
+    user_client.post(
+        f"/posts/{visible_post.id}/edit_comment/{comment.id}/",
+        {"text": "Новый текст"},
+    )
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что после редактирования комментария страница поста"
+        " отдаётся заново."
+    )
+
+
+def test_hidden_post_is_not_found_before_not_modified(
+        client, visible_post):
+    url = f"/posts/{visible_post.id}/"
+    etag = client.get(url)["ETag"]
+    visible_post.category.is_published = False
+    visible_post.category.save()
+    assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_FOUND, (
+        "Убедитесь, что скрытый пост отвечает 404 и на условный запрос."
+    )
+
+
+def test_deleted_post_changes_index_etag(client, mixer, visible_post):
+    older = mixer.blend(
+        "blog.Post",
+        category=visible_post.category,
+        is_published=True,
+        pub_date=visible_post.pub_date - timedelta(days=1),
+    )
+    etag = client.get("/")["ETag"]
+    older.delete()
+    response = client.get("/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+
+
+@pytest.mark.parametrize("rename", ["location", "author"])
+def test_renamed_relation_changes_etag(client, visible_post, rename):
+    etag = client.get("/")["ETag"]
+    if rename == "location":
+        visible_post.location.name = "Новое место"
+        visible_post.location.save()
+    else:
+        visible_post.author.username = "renamed"
+        visible_post.author.save()
+    response = client.get("/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK, (
+        "Убедитесь, что после переименования места или автора лента"
+        " отдаётся заново."
+    )
+    assert ("Новое место" if rename == "location" else "renamed") in (
+        response.content.decode()
+    )
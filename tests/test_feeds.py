@@ -0,0 +1,102 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures("clear_cache"),
+]
+
+
+@pytest.fixture
+def feed_urls(visible_post):
+    slug = visible_post.category.slug
+    username = visible_post.author.username
+    return [
+        "/feed/",
+        "/feed/atom/",
+        f"/category/{slug}/feed/",
+        f"/category/{slug}/feed/atom/",
+        f"/profile/{username}/feed/",
+        f"/profile/{username}/feed/atom/",
+    ]
+
+
+def test_feeds_list_visible_posts(client, feed_urls, visible_post):
+    for url in feed_urls:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f"Убедитесь, что лента `{url}` доступна."
+        )
+        assert visible_post.title in response.content.decode(), (
+            f"Убедитесь, что опубликованный пост попадает в ленту `{url}`."
+        )
+
+
+def test_feed_answers_not_modified(client, feed_urls):
+    for url in feed_urls:
+        etag = client.get(url)["ETag"]
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f"Убедитесь, что неизменившаяся лента `{url}` отвечает"
+            " 304 Not Modified."
+        )
+
+
+def test_feed_updates_after_publication(
+        client, mixer, visible_post):
+    client.get("/feed/")
+    new_post = mixer.blend(
+        "blog.Post",
+        author=visible_post.author,
+        category=visible_post.category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(minutes=1),
+    )
+    response = client.get("/feed/")
+    assert new_post.title in response.content.decode(), (
+        "Убедитесь, что новая публикация сразу появляется в ленте."
+    )
+
+
+def test_unpublished_category_feed_not_found(client, mixer):
+    category = mixer.blend("blog.Category", is_published=False)
+    response = client.get(f"/category/{category.slug}/feed/")
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_post_change_keeps_unrelated_feeds_cached(
+        client, mixer, visible_post, another_user, another_category,
+        django_assert_num_queries):
+    other_urls = [
+        f"/category/{another_category.slug}/feed/",
+        f"/profile/{another_user.username}/feed/",
+    ]
+    for url in other_urls:
+        client.get(url)
+    visible_post.title = "Новый заголовок"
+    visible_post.save()
+    for url in other_urls:
+        with django_assert_num_queries(0):
+            client.get(url)
+    for url in (
+        "/feed/",
+        f"/category/{visible_post.category.slug}/feed/",
+        f"/profile/{visible_post.author.username}/feed/",
+    ):
+        assert "Новый заголовок" in client.get(url).content.decode(), (
+            f"Убедитесь, что изменение поста обновляет ленту `{url}`."
+        )
+
+
+@override_settings(ALLOWED_HOSTS=["one.example", "two.example"])
+def test_feeds_are_cached_per_host(client, feed_urls):
+    for url in feed_urls:
+        client.get(url, HTTP_HOST="one.example")
+        content = client.get(url, HTTP_HOST="two.example").content.decode()
+        assert "two.example" in content and "one.example" not in content, (
+            "Убедитесь, что ленты кешируются отдельно для каждого хоста."
+        )
@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def many_posts(clear_cache, mixer, user, published_category):
+    now = timezone.now()
+    return mixer.cycle(125).blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=(now - timedelta(hours=hours) for hours in range(1, 126)),
+    )
+
+
+def count_queries(queries):
+    return [query for query in queries if "COUNT(*)" in query["sql"]]
+
+
+def test_page_window_is_bounded(client, many_posts):
+    response = client.get("/", {"page": 7})
+    assert response.status_code == 200
+    window = response.context["page_obj"].page_window
+    assert window == [1, "…", 5, 6, 7, 8, 9, "…", 13], (
+        "Убедитесь, что пагинатор выводит ссылки только на соседние страницы."
+    )
+    assert response.content.decode().count('class="page-link"') < 16
+
+
+def test_count_is_cached(client, many_posts):
+    client.get("/")
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/", {"page": 2})
+    assert response.status_code == 200
+    assert not count_queries(queries), (
+        "Убедитесь, что число публикаций для пагинации берётся из кеша."
+    )
+    many_posts[0].delete()
+    with CaptureQueriesContext(connection) as queries:
+        client.get("/")
+    assert count_queries(queries)
+
+
+def test_has_next_mode_skips_count(client, many_posts, settings):
+    settings.PAGINATION_MODE = "has_next"
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/", {"page": 13})
+    assert response.status_code == 200
+    assert not count_queries(queries)
+    page = response.context["page_obj"]
+    assert len(page.object_list) == 5
+    assert page.has_previous() and not page.has_next()
+    assert 'href="?page=12"' in response.content.decode()
+    assert client.get("/", {"page": 12}).context["page_obj"].has_next()
+    assert client.get("/", {"page": 14}).status_code == 404
@@ -0,0 +1,191 @@
+import re
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.template.defaultfilters import truncatewords
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def commented_post(mixer, visible_posts, another_user):
+    post = visible_posts[0]
+    mixer.cycle(5).blend("blog.Comment", post=post)
+    return post
+
+
+def test_anonymous_feed_skips_auth_queries(client, visible_posts):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/")
+    assert response.status_code == 200
+    sql = [query["sql"] for query in queries]
+    assert not any("django_session" in query for query in sql), (
+        "Убедитесь, что для запроса без cookie сессии лента не обращается"
+        " к таблице сессий."
+    )
+    assert not any(
+        query.startswith('SELECT "auth_user"') for query in sql
+    ), (
+        "Убедитесь, что для анонимного запроса пользователь не загружается"
+        " из базы данных."
+    )
+
+
+def test_post_detail_loads_comment_authors_once(
+        client, commented_post):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(f"/posts/{commented_post.id}/")
+    assert response.status_code == 200
+    author_queries = [
+        query for query in queries
+        if query["sql"].startswith('SELECT "auth_user"')
+    ]
+    assert not author_queries, (
+        "Убедитесь, что авторы комментариев загружаются вместе с"
+        " комментариями, а не отдельным запросом на каждый комментарий."
+    )
+
+
+def test_comment_create_probes_post_once(user_client, visible_posts):
+    post = visible_posts[0]
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.post(
+            f"/posts/{post.id}/comment/", {"text": "Комментарий"}
+        )
+    assert response.status_code == 302
+    post_queries = [
+        query["sql"] for query in queries
+        if query["sql"].startswith("SELECT") and '"blog_post"' in query["sql"]
+    ]
+    assert len(post_queries) == 1, (
+        "Убедитесь, что при добавлении комментария пост проверяется"
+        " одним запросом."
+    )
+    assert "blog_comment" not in post_queries[0]
+    assert "COUNT(" not in post_queries[0]
+    assert post.comments.count() == 1
+
+
+@pytest.mark.parametrize("url", [
+    "/posts/{post.id}/edit/",
+    "/posts/{post.id}/delete/",
+    "/posts/{post.id}/edit_comment/{comment.id}/",
+    "/posts/{post.id}/delete_comment/{comment.id}/",
+])
+def test_owner_views_load_object_once(
+        url, mixer, user, user_client, visible_posts):
+    post = visible_posts[0]
+    comment = mixer.blend("blog.Comment", post=post, author=user)
+    table = '"blog_comment"' if "comment" in url else '"blog_post"'
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get(url.format(post=post, comment=comment))
+    assert response.status_code == 200
+    loads = [
+        query["sql"] for query in queries
+        if query["sql"].startswith(f"SELECT {table}")
+    ]
+    assert len(loads) == 1, (
+        "Убедитесь, что страницы редактирования и удаления загружают"
+        " объект из базы данных один раз."
+    )
+
+
+def test_post_form_renders_selected_options_only(
+        mixer, user_client, visible_posts):
+    mixer.cycle(30).blend("blog.Location", is_published=True)
+    mixer.cycle(30).blend("blog.Category", is_published=True)
+    post = visible_posts[0]
+    response = user_client.get(f"/posts/{post.id}/edit/")
+    content = response.content.decode()
+    assert content.count("<option") <= 4, (
+        "Убедитесь, что форма публикации не выводит все местоположения"
+        " и категории, а только выбранные."
+    )
+    assert f'value="{post.category_id}" selected' in content
+    response = user_client.get("/posts/create/")
+    assert response.content.decode().count("<option") <= 2
+
+
+def test_feed_renders_stored_excerpt(client, visible_posts):
+    post = visible_posts[0]
+    post.text = " ".join(f"слово{index}" for index in range(20))
+    post.save()
+    assert post.excerpt == truncatewords(post.text, 10), (
+        "Убедитесь, что сохранённое начало текста совпадает с фильтром"
+        " truncatewords."
+    )
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/")
+    assert post.excerpt in response.content.decode()
+    feed_query = next(
+        query["sql"] for query in queries
+        if query["sql"].startswith('SELECT "blog_post"."id"')
+    )
+    assert '"blog_post"."text"' not in feed_query, (
+        "Убедитесь, что лента не загружает полный текст публикаций."
+    )
+
+
+def test_feed_selects_card_columns_only(client, visible_posts):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get("/")
+    assert response.status_code == 200
+    feed_query = next(
+        query["sql"] for query in queries
+        if query["sql"].startswith('SELECT "blog_post"."id"')
+    )
+    columns = set(re.findall(r'"(\w+)"\."(\w+)"', feed_query.split(
+        " FROM ", 1
+    )[0]))
+    assert columns == {
+        ("blog_post", "id"),
+        ("blog_post", "title"),
+        ("blog_post", "excerpt"),
+        ("blog_post", "image"),
+        ("blog_post", "pub_date"),
+        ("blog_post", "is_published"),
+        ("blog_post", "author_id"),
+        ("blog_post", "location_id"),
+        ("blog_post", "category_id"),
+        ("auth_user", "id"),
+        ("auth_user", "username"),
+        ("blog_location", "id"),
+        ("blog_location", "name"),
+        ("blog_location", "is_published"),
+        ("blog_category", "id"),
+        ("blog_category", "title"),
+        ("blog_category", "slug"),
+        ("blog_category", "is_published"),
+        ("blog_comment", "id"),
+    }, "Убедитесь, что лента выбирает только поля, нужные карточке поста."
+    assert not any("blog_comment" in query["sql"] and "IN (" in query["sql"]
+                   for query in queries), (
+        "Убедитесь, что лента не загружает комментарии к постам."
+    )
+    assert len(queries) <= 4
+
+
+def test_owner_feed_filters_on_author_id_only(
+        mixer, user, user_client, visible_posts, published_category):
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=False, pub_date=timezone.now() - timedelta(days=1),
+    )
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() + timedelta(days=1),
+    )
+    with CaptureQueriesContext(connection) as queries:
+        response = user_client.get(f"/profile/{user.username}/")
+    assert response.context["paginator"].count == len(visible_posts) + 2, (
+        "Убедитесь, что автор видит в профиле черновики и отложенные посты."
+    )
+    feed_query = next(
+        query["sql"] for query in queries
+        if query["sql"].startswith('SELECT "blog_post"."id"')
+    )
+    assert '"auth_user"."username" =' not in feed_query
+    assert '"blog_post"."author_id" =' in feed_query
@@ -0,0 +1,131 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from blog.models import Post
+from blog.scheduler import Scheduler, publish_due
+from blog.signals import post_published
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def scheduled_post(mixer, user, published_category):
+    publish_due(timezone.now() - timedelta(minutes=1))
+    return mixer.blend(
+        "blog.Post",
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() + timedelta(hours=1),
+    )
+
+
+def go_live(post):
+    """Move pub_date to the past without a save, as the clock would."""
+    Post.objects.filter(id=post.id).update(pub_date=timezone.now())
+    post.refresh_from_db()
+
+
+@pytest.fixture
+def events():
+    received = []
+
+    def receiver(sender, posts, **kwargs):
+        received.append([post.id for post in posts])
+
+    post_published.connect(receiver)
+    yield received
+    post_published.disconnect(receiver)
+
+
+def test_publish_due_fires_once(scheduled_post, events, mixer, user,
+                                published_category):
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(minutes=2),
+    )
+    assert publish_due() == []
+    go_live(scheduled_post)
+    assert publish_due() == [scheduled_post]
+    assert events == [[scheduled_post.id]], (
+        "Убедитесь, что событие публикации отправляется только для"
+        " постов, вышедших после предыдущего запуска."
+    )
+    assert publish_due() == []
+    assert len(events) == 1
+
+
+def test_published_event_updates_counters(scheduled_post, published_category):
+    published_category.refresh_from_db()
+    assert published_category.post_count == 0
+    go_live(scheduled_post)
+    publish_due()
+    published_category.refresh_from_db()
+    assert published_category.post_count == 1
+    assert published_category.last_post_at == scheduled_post.pub_date
+    assert scheduled_post.author.stats.post_count == 1
+
+
+def test_edit_before_event_counts_once(scheduled_post, mixer,
+                                       published_category):
+    go_live(scheduled_post)
+    other_category = mixer.blend("blog.Category", is_published=True)
+    scheduled_post.category = other_category
+    scheduled_post.save()
+    publish_due()
+    published_category.refresh_from_db()
+    other_category.refresh_from_db()
+    assert (published_category.post_count, other_category.post_count) == (
+        0, 1
+    ), (
+        "Убедитесь, что пост, изменённый между датой публикации и"
+        " запуском планировщика, учитывается один раз."
+    )
+    assert scheduled_post.author.stats.post_count == 1
+
+
+def test_post_edited_while_scheduler_was_down_is_published(
+    scheduled_post, events, published_category
+):
+    go_live(scheduled_post)
+    scheduled_post.title = "Исправленный заголовок"
+    scheduled_post.save()
+    assert publish_due() == [scheduled_post], (
+        "Убедитесь, что планировщик публикует посты, изменённые после"
+        " выхода, пока он не работал."
+    )
+    published_category.refresh_from_db()
+    assert published_category.post_count == 1
+
+
+def test_stale_watermark_does_not_stop_counting(mixer, user,
+                                                published_category):
+    publish_due(timezone.now() - timedelta(hours=1))
+    mixer.blend(
+        "blog.Post", author=user, category=published_category,
+        is_published=True, pub_date=timezone.now() - timedelta(minutes=1),
+    )
+    published_category.refresh_from_db()
+    assert published_category.post_count == 1, (
+        "Убедитесь, что опубликованный пост учитывается сразу, даже если"
+        " планировщик давно не запускался."
+    )
+    assert user.stats.post_count == 1
+    publish_due()
+    published_category.refresh_from_db()
+    assert published_category.post_count == 1
+    user.stats.refresh_from_db()
+    assert user.stats.post_count == 1
+
+
+def test_scheduler_sleeps_until_next_post(scheduled_post):
+    scheduler = Scheduler(rescan_interval=7200)
+    scheduler.run_once()
+    assert scheduler.heap == [(scheduled_post.pub_date, scheduled_post.id)]
+    assert 3500 < scheduler.seconds_to_wakeup() <= 3600
+    short = Scheduler(rescan_interval=60)
+    short.run_once()
+    assert short.heap == []
+    assert short.seconds_to_wakeup() <= 60
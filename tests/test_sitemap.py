@@ -0,0 +1,75 @@
+from http import HTTPStatus
+
+import pytest
+from django.test import override_settings
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures("clear_cache"),
+]
+
+
+def get_content(response):
+    if response.streaming:
+        return b"".join(response.streaming_content).decode()
+    return response.content.decode()
+
+
+def test_sitemap_index_lists_chunks(client, visible_post):
+    response = client.get("/sitemap.xml")
+    assert response.status_code == HTTPStatus.OK
+    content = get_content(response)
+    for section in ("posts", "categories", "profiles"):
+        assert f"/sitemap-{section}-0.xml" in content, (
+            f"Убедитесь, что индекс карты сайта ссылается на раздел"
+            f" `{section}`."
+        )
+
+
+def test_sitemap_chunk_lists_visible_posts(
+        client, visible_post, hidden_post):
+    response = client.get("/sitemap-posts-0.xml")
+    assert response.status_code == HTTPStatus.OK
+    content = get_content(response)
+    assert f"/posts/{visible_post.id}/" in content, (
+        "Убедитесь, что опубликованный пост попадает в карту сайта."
+    )
+    assert f"/posts/{hidden_post.id}/" not in content, (
+        "Убедитесь, что неопубликованный пост не попадает в карту сайта."
+    )
+    cached = client.get("/sitemap-posts-0.xml")
+    assert get_content(cached) == content
+    not_modified = client.get(
+        "/sitemap-posts-0.xml",
+        HTTP_IF_MODIFIED_SINCE=response["Last-Modified"],
+    )
+    assert not_modified.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_sitemap_unknown_chunk_not_found(client, visible_post):
+    assert client.get("/sitemap-posts-999.xml").status_code == (
+        HTTPStatus.NOT_FOUND
+    )
+
+
+@override_settings(ALLOWED_HOSTS=["one.example", "two.example"])
+def test_sitemaps_are_cached_per_host(client, visible_post):
+    for url in ("/sitemap.xml", "/sitemap-posts-0.xml"):
+        client.get(url, HTTP_HOST="one.example")
+        content = get_content(client.get(url, HTTP_HOST="two.example"))
+        assert "two.example" in content and "one.example" not in content, (
+            "Убедитесь, что карта сайта кешируется отдельно для каждого"
+            " хоста."
+        )
+
+
+def test_renamed_category_leaves_cached_chunk(client, visible_post):
+    category = visible_post.category
+    old_url = f"/category/{category.slug}/"
+    assert old_url in get_content(client.get("/sitemap-categories-0.xml"))
+    category.slug = "renamed"
+    category.save()
+    content = get_content(client.get("/sitemap-categories-0.xml"))
+    assert "/category/renamed/" in content and old_url not in content, (
+        "Убедитесь, что после смены slug категории карта сайта обновляется."
+    )
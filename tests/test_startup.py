@@ -0,0 +1,77 @@
+import pytest
+from django.conf import settings
+from django.core import checks
+from django.core.exceptions import ImproperlyConfigured
+from django.template import engines
+from django.test import override_settings
+
+from core.checks import run_startup_checks
+from core.templates import warmup_templates
+
+CACHED_TEMPLATES = [{
+    **settings.TEMPLATES[0],
+    "APP_DIRS": False,
+    "OPTIONS": {
+        **settings.TEMPLATES[0]["OPTIONS"],
+        "loaders": [
+            ("django.template.loaders.cached.Loader", [
+                "django.template.loaders.filesystem.Loader",
+                "django.template.loaders.app_directories.Loader",
+            ]),
+        ],
+    },
+}]
+
+
+def production_check_ids():
+    return {
+        message.id for message in checks.run_checks(tags=["production"])
+    }
+
+
+@override_settings(PRODUCTION=False, DEBUG=True)
+def test_production_checks_skip_development_profile():
+    assert not production_check_ids()
+
+
+@override_settings(PRODUCTION=True)
+def test_development_secret_key_is_refused():
+    with override_settings(SECRET_KEY=settings.DEVELOPMENT_SECRET_KEY):
+        assert "core.E007" in production_check_ids(), (
+            "Убедитесь, что продакшен-профиль не принимает SECRET_KEY"
+            " из репозитория."
+        )
+    with override_settings(SECRET_KEY="x" * 50):
+        assert "core.E007" not in production_check_ids()
+
+
+@override_settings(PRODUCTION=True, DEBUG=True, TEMPLATES_CACHED=False)
+def test_startup_refuses_slow_settings():
+    assert {"core.E001", "core.E002"} <= production_check_ids()
+    with pytest.raises(ImproperlyConfigured):
+        run_startup_checks()
+
+
+@override_settings(PRODUCTION=True)
+def test_process_local_cache_is_refused():
+    locmem = {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    with override_settings(CACHES={"default": locmem}):
+        assert "core.E008" in production_check_ids(), (
+            "Убедитесь, что продакшен-профиль не принимает кеш в памяти"
+            " отдельного процесса."
+        )
+    shared = {"BACKEND": "django.core.cache.backends.db.DatabaseCache",
+              "LOCATION": "cache"}
+    with override_settings(CACHES={"default": shared}):
+        assert "core.E008" not in production_check_ids()
+
+
+@override_settings(TEMPLATES=CACHED_TEMPLATES)
+def test_warmup_compiles_app_templates():
+    warmup_templates()
+    loader, = engines["django"].engine.template_loaders
+    cached = {name.split(":")[0] for name in loader.get_template_cache}
+    assert {"blog/index.html", "admin/base.html"} <= cached, (
+        "Убедитесь, что при старте компилируются шаблоны проекта"
+        " и приложений."
+    )
@@ -0,0 +1,110 @@
+import pytest
+from django.core import mail
+from django.core.mail import EmailMultiAlternatives, send_mail
+from django.test import override_settings
+
+from core.tasks import (
+    get_dead_letter_queue,
+    get_task_queue,
+    retry_delay,
+    run_batch,
+    task,
+)
+
+CALLS = []
+
+
+@task
+def record(value, flag=False):
+    CALLS.append((value, flag))
+
+
+@task
+def explode():
+    raise RuntimeError("boom")
+
+
+@pytest.fixture(autouse=True)
+def spool(tmp_path):
+    get_task_queue.cache_clear()
+    get_dead_letter_queue.cache_clear()
+    CALLS.clear()
+    with override_settings(
+        SPOOL_PATH=tmp_path / "spool.sqlite3",
+        TASK_RETRY_DELAY=0,
+        TASK_MAX_ATTEMPTS=3,
+    ):
+        yield
+    get_task_queue.cache_clear()
+    get_dead_letter_queue.cache_clear()
+
+
+def test_delay_runs_in_worker():
+    record.delay("первый", flag=True)
+    record.delay("второй")
+    assert not CALLS
+    assert run_batch(10) == 2
+    assert CALLS == [("первый", True), ("второй", False)]
+    assert get_task_queue().stats()["depth"] == 0
+
+
+def test_failing_task_is_retried_then_dead_lettered():
+    explode.delay()
+    for _ in range(3):
+        assert run_batch(10) == 1
+    assert run_batch(10) == 0
+    assert get_task_queue().stats()["depth"] == 0
+    dead = get_dead_letter_queue().claim(10)
+    assert [message.payload["task"] for message in dead] == [
+        explode.task_name
+    ]
+    assert "boom" in dead[0].payload["error"]
+
+
+@override_settings(TASK_RETRY_DELAY=10, TASK_RETRY_MAX_DELAY=60)
+def test_retry_backoff():
+    assert [retry_delay(attempt) for attempt in range(1, 6)] == [
+        10, 20, 40, 60, 60
+    ]
+
+
+@override_settings(
+    EMAIL_BACKEND="core.mail.QueuedEmailBackend",
+    TASKS_EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+)
+def test_queued_email_backend():
+    mail.outbox = []
+    send_mail("Тема", "Текст письма", "from@example.com", ["to@example.com"])
+    assert not mail.outbox, (
+        "Убедитесь, что письмо ставится в очередь, а не отправляется сразу."
+    )
+    run_batch(10)
+    assert len(mail.outbox) == 1
+    assert mail.outbox[0].subject == "Тема"
+
+
+@override_settings(
+    EMAIL_BACKEND="core.mail.QueuedEmailBackend",
+    TASKS_EMAIL_BACKEND="django.core.mail.backends.locmem.EmailBackend",
+)
+def test_queued_email_keeps_every_field():
+    mail.outbox = []
+    message = EmailMultiAlternatives(
+        "Тема", "Текст письма", "from@example.com", ["to@example.com"],
+        bcc=["bcc@example.com"], cc=["cc@example.com"],
+        reply_to=["reply@example.com"], headers={"X-Tag": "reset"},
+    )
+    message.attach_alternative("<p>Текст письма</p>", "text/html")
+    message.attach("report.bin", b"\x00\xff", "application/octet-stream")
+    message.send()
+    run_batch(10)
+    sent, = mail.outbox
+    assert (sent.to, sent.cc, sent.bcc, sent.reply_to) == (
+        ["to@example.com"], ["cc@example.com"], ["bcc@example.com"],
+        ["reply@example.com"],
+    )
+    assert sent.extra_headers == {"X-Tag": "reset"}
+    assert sent.alternatives == [("<p>Текст письма</p>", "text/html")]
+    assert sent.attachments == [
+        ("report.bin", b"\x00\xff", "application/octet-stream")
+    ], "Убедитесь, что письмо из очереди восстанавливается целиком."